@@ -5,49 +5,399 @@ d = { 'settings': { 'branch': 'main',
                 'doc_host': 'https://Hopsakee.github.io',
                 'git_url': 'https://github.com/Hopsakee/keybindings_fps',
                 'lib_path': 'keybindings_fps'},
-  'syms': { 'keybindings_fps.core': {'keybindings_fps.core.foo': ('populate_db_defaults.html#foo', 'keybindings_fps/core.py')},
-            'keybindings_fps.create_db_structure': { 'keybindings_fps.create_db_structure.add_clmn_to_table': ( 'create_db_structure.html#add_clmn_to_table',
+  'syms': { 'keybindings_fps.async_db': { 'keybindings_fps.async_db.AsyncDB': ('async_db.html#asyncdb', 'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.__init__': ( 'async_db.html#asyncdb.__init__',
+                                                                                         'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB._call': ( 'async_db.html#asyncdb._call',
+                                                                                      'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.add_action': ( 'async_db.html#asyncdb.add_action',
+                                                                                           'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.add_binding': ( 'async_db.html#asyncdb.add_binding',
+                                                                                            'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.add_game': ( 'async_db.html#asyncdb.add_game',
+                                                                                         'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.binding': ( 'async_db.html#asyncdb.binding',
+                                                                                        'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.close': ( 'async_db.html#asyncdb.close',
+                                                                                      'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.copy_default_bindings': ( 'async_db.html#asyncdb.copy_default_bindings',
+                                                                                                      'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.delete_binding': ( 'async_db.html#asyncdb.delete_binding',
+                                                                                               'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.delete_game': ( 'async_db.html#asyncdb.delete_game',
+                                                                                            'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.game': ( 'async_db.html#asyncdb.game',
+                                                                                     'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.read': ( 'async_db.html#asyncdb.read',
+                                                                                     'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.reorder_bindings': ( 'async_db.html#asyncdb.reorder_bindings',
+                                                                                                 'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.reset_game_bindings': ( 'async_db.html#asyncdb.reset_game_bindings',
+                                                                                                    'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.update_binding': ( 'async_db.html#asyncdb.update_binding',
+                                                                                               'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.update_game_image': ( 'async_db.html#asyncdb.update_game_image',
+                                                                                                  'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db.AsyncDB.write': ( 'async_db.html#asyncdb.write',
+                                                                                      'keybindings_fps/async_db.py'),
+                                          'keybindings_fps.async_db._add_game': ('async_db.html#_add_game', 'keybindings_fps/async_db.py')},
+            'keybindings_fps.benchmarks': { 'keybindings_fps.benchmarks._bench_routes': ( 'benchmarks.html#_bench_routes',
+                                                                                          'keybindings_fps/benchmarks.py'),
+                                            'keybindings_fps.benchmarks.bench_functions': ( 'benchmarks.html#bench_functions',
+                                                                                            'keybindings_fps/benchmarks.py'),
+                                            'keybindings_fps.benchmarks.bench_routes': ( 'benchmarks.html#bench_routes',
+                                                                                         'keybindings_fps/benchmarks.py'),
+                                            'keybindings_fps.benchmarks.benchmark': ( 'benchmarks.html#benchmark',
+                                                                                      'keybindings_fps/benchmarks.py'),
+                                            'keybindings_fps.benchmarks.build_synthetic_db': ( 'benchmarks.html#build_synthetic_db',
+                                                                                               'keybindings_fps/benchmarks.py'),
+                                            'keybindings_fps.benchmarks.compare_results': ( 'benchmarks.html#compare_results',
+                                                                                            'keybindings_fps/benchmarks.py'),
+                                            'keybindings_fps.benchmarks.count_queries': ( 'benchmarks.html#count_queries',
+                                                                                          'keybindings_fps/benchmarks.py'),
+                                            'keybindings_fps.benchmarks.measure': ( 'benchmarks.html#measure',
+                                                                                    'keybindings_fps/benchmarks.py'),
+                                            'keybindings_fps.benchmarks.run_benchmarks': ( 'benchmarks.html#run_benchmarks',
+                                                                                           'keybindings_fps/benchmarks.py')},
+            'keybindings_fps.binding_matrix': { 'keybindings_fps.binding_matrix.BindingMatrix': ( 'binding_matrix.html#bindingmatrix',
+                                                                                                  'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.BindingMatrix.__init__': ( 'binding_matrix.html#bindingmatrix.__init__',
+                                                                                                           'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.BindingMatrix.load': ( 'binding_matrix.html#bindingmatrix.load',
+                                                                                                       'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.BindingMatrix.nbytes': ( 'binding_matrix.html#bindingmatrix.nbytes',
+                                                                                                         'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.BindingMatrix.pack': ( 'binding_matrix.html#bindingmatrix.pack',
+                                                                                                       'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.BindingMatrix.row': ( 'binding_matrix.html#bindingmatrix.row',
+                                                                                                      'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.BindingMatrix.rows': ( 'binding_matrix.html#bindingmatrix.rows',
+                                                                                                       'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.BindingMatrix.unpack': ( 'binding_matrix.html#bindingmatrix.unpack',
+                                                                                                         'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix._retained_bytes': ( 'binding_matrix.html#_retained_bytes',
+                                                                                                    'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.key_usage': ( 'binding_matrix.html#key_usage',
+                                                                                              'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.matrix_conflicts': ( 'binding_matrix.html#matrix_conflicts',
+                                                                                                     'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.matrix_diff': ( 'binding_matrix.html#matrix_diff',
+                                                                                                'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.matrix_divergence': ( 'binding_matrix.html#matrix_divergence',
+                                                                                                      'keybindings_fps/binding_matrix.py'),
+                                                'keybindings_fps.binding_matrix.memory_footprint': ( 'binding_matrix.html#memory_footprint',
+                                                                                                     'keybindings_fps/binding_matrix.py')},
+            'keybindings_fps.core': {'keybindings_fps.core.foo': ('populate_db_defaults.html#foo', 'keybindings_fps/core.py')},
+            'keybindings_fps.create_db_structure': { 'keybindings_fps.create_db_structure.ConnectionFactory': ( 'create_db_structure.html#connectionfactory',
                                                                                                                 'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionFactory.__init__': ( 'create_db_structure.html#connectionfactory.__init__',
+                                                                                                                         'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionFactory.checkout': ( 'create_db_structure.html#connectionfactory.checkout',
+                                                                                                                         'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionFactory.close': ( 'create_db_structure.html#connectionfactory.close',
+                                                                                                                      'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionFactory.connect': ( 'create_db_structure.html#connectionfactory.connect',
+                                                                                                                        'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionFactory.connection': ( 'create_db_structure.html#connectionfactory.connection',
+                                                                                                                           'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionFactory.current': ( 'create_db_structure.html#connectionfactory.current',
+                                                                                                                        'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionFactory.middleware': ( 'create_db_structure.html#connectionfactory.middleware',
+                                                                                                                           'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionFactory.on_connect': ( 'create_db_structure.html#connectionfactory.on_connect',
+                                                                                                                           'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionFactory.release': ( 'create_db_structure.html#connectionfactory.release',
+                                                                                                                        'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionMiddleware': ( 'create_db_structure.html#connectionmiddleware',
+                                                                                                                   'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionMiddleware.__call__': ( 'create_db_structure.html#connectionmiddleware.__call__',
+                                                                                                                            'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.ConnectionMiddleware.__init__': ( 'create_db_structure.html#connectionmiddleware.__init__',
+                                                                                                                            'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.DatabaseProxy': ( 'create_db_structure.html#databaseproxy',
+                                                                                                            'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.DatabaseProxy.__getattr__': ( 'create_db_structure.html#databaseproxy.__getattr__',
+                                                                                                                        'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.DatabaseProxy.__init__': ( 'create_db_structure.html#databaseproxy.__init__',
+                                                                                                                     'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.DatabaseProxy.__repr__': ( 'create_db_structure.html#databaseproxy.__repr__',
+                                                                                                                     'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure._upgrading': ( 'create_db_structure.html#_upgrading',
+                                                                                                         'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.add_clmn_to_table': ( 'create_db_structure.html#add_clmn_to_table',
+                                                                                                                'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.apply_pragmas': ( 'create_db_structure.html#apply_pragmas',
+                                                                                                            'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.create_image_digests': ( 'create_db_structure.html#create_image_digests',
+                                                                                                                   'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.create_indexes': ( 'create_db_structure.html#create_indexes',
+                                                                                                             'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.create_revisions_table': ( 'create_db_structure.html#create_revisions_table',
+                                                                                                                     'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.create_search_index': ( 'create_db_structure.html#create_search_index',
+                                                                                                                  'keybindings_fps/create_db_structure.py'),
                                                      'keybindings_fps.create_db_structure.create_tables': ( 'create_db_structure.html#create_tables',
                                                                                                             'keybindings_fps/create_db_structure.py'),
                                                      'keybindings_fps.create_db_structure.drop_clmn_from_table': ( 'create_db_structure.html#drop_clmn_from_table',
                                                                                                                    'keybindings_fps/create_db_structure.py'),
+                                                     'keybindings_fps.create_db_structure.image_digest': ( 'create_db_structure.html#image_digest',
+                                                                                                           'keybindings_fps/create_db_structure.py'),
                                                      'keybindings_fps.create_db_structure.init_db': ( 'create_db_structure.html#init_db',
                                                                                                       'keybindings_fps/create_db_structure.py')},
-            'keybindings_fps.gui_binding_tables': { 'keybindings_fps.gui_binding_tables.create_actions_table': ( 'gui_binding_tables.html#create_actions_table',
+            'keybindings_fps.gui_binding_tables': { 'keybindings_fps.gui_binding_tables.FragmentCache': ( 'gui_binding_tables.html#fragmentcache',
+                                                                                                          'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.FragmentCache.__init__': ( 'gui_binding_tables.html#fragmentcache.__init__',
+                                                                                                                   'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.FragmentCache.clear': ( 'gui_binding_tables.html#fragmentcache.clear',
+                                                                                                                'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.FragmentCache.get': ( 'gui_binding_tables.html#fragmentcache.get',
+                                                                                                              'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.FragmentCache.put': ( 'gui_binding_tables.html#fragmentcache.put',
+                                                                                                              'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.FragmentCache.stats': ( 'gui_binding_tables.html#fragmentcache.stats',
+                                                                                                                'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables._code_fingerprint': ( 'gui_binding_tables.html#_code_fingerprint',
+                                                                                                              'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables._marked': ( 'gui_binding_tables.html#_marked',
+                                                                                                    'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.binding_editor_row': ( 'gui_binding_tables.html#binding_editor_row',
+                                                                                                               'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.binding_messages': ( 'gui_binding_tables.html#binding_messages',
+                                                                                                             'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.binding_row': ( 'gui_binding_tables.html#binding_row',
+                                                                                                        'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.cached_fragment': ( 'gui_binding_tables.html#cached_fragment',
+                                                                                                            'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.category_tables_oob': ( 'gui_binding_tables.html#category_tables_oob',
+                                                                                                                'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.conflict_warning': ( 'gui_binding_tables.html#conflict_warning',
+                                                                                                             'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.create_actions_table': ( 'gui_binding_tables.html#create_actions_table',
                                                                                                                  'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.create_binding_row': ( 'gui_binding_tables.html#create_binding_row',
+                                                                                                               'keybindings_fps/gui_binding_tables.py'),
                                                     'keybindings_fps.gui_binding_tables.create_binding_table_category': ( 'gui_binding_tables.html#create_binding_table_category',
                                                                                                                           'keybindings_fps/gui_binding_tables.py'),
                                                     'keybindings_fps.gui_binding_tables.create_bindings_table': ( 'gui_binding_tables.html#create_bindings_table',
                                                                                                                   'keybindings_fps/gui_binding_tables.py'),
                                                     'keybindings_fps.gui_binding_tables.create_bindings_table_print': ( 'gui_binding_tables.html#create_bindings_table_print',
                                                                                                                         'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.create_conflicts_table': ( 'gui_binding_tables.html#create_conflicts_table',
+                                                                                                                   'keybindings_fps/gui_binding_tables.py'),
                                                     'keybindings_fps.gui_binding_tables.get_action_name': ( 'gui_binding_tables.html#get_action_name',
                                                                                                             'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.get_binding': ( 'gui_binding_tables.html#get_binding',
+                                                                                                        'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.get_default_bindings': ( 'gui_binding_tables.html#get_default_bindings',
+                                                                                                                 'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.get_game_bindings': ( 'gui_binding_tables.html#get_game_bindings',
+                                                                                                              'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.get_game_conflicts': ( 'gui_binding_tables.html#get_game_conflicts',
+                                                                                                               'keybindings_fps/gui_binding_tables.py'),
                                                     'keybindings_fps.gui_binding_tables.get_key_name': ( 'gui_binding_tables.html#get_key_name',
                                                                                                          'keybindings_fps/gui_binding_tables.py'),
                                                     'keybindings_fps.gui_binding_tables.get_modifier_name': ( 'gui_binding_tables.html#get_modifier_name',
-                                                                                                              'keybindings_fps/gui_binding_tables.py')},
+                                                                                                              'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.http_headers': ( 'gui_binding_tables.html#http_headers',
+                                                                                                         'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.not_modified': ( 'gui_binding_tables.html#not_modified',
+                                                                                                         'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.page_headers': ( 'gui_binding_tables.html#page_headers',
+                                                                                                         'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.revalidate': ( 'gui_binding_tables.html#revalidate',
+                                                                                                       'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.search_bindings': ( 'gui_binding_tables.html#search_bindings',
+                                                                                                            'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.search_query': ( 'gui_binding_tables.html#search_query',
+                                                                                                         'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.search_results': ( 'gui_binding_tables.html#search_results',
+                                                                                                           'keybindings_fps/gui_binding_tables.py'),
+                                                    'keybindings_fps.gui_binding_tables.select_options': ( 'gui_binding_tables.html#select_options',
+                                                                                                           'keybindings_fps/gui_binding_tables.py')},
             'keybindings_fps.helpers': { 'keybindings_fps.helpers.base_layout': ('helpers.html#base_layout', 'keybindings_fps/helpers.py'),
                                          'keybindings_fps.helpers.ex_theme_switcher': ( 'helpers.html#ex_theme_switcher',
                                                                                         'keybindings_fps/helpers.py'),
+                                         'keybindings_fps.helpers.game_card': ('helpers.html#game_card', 'keybindings_fps/helpers.py'),
+                                         'keybindings_fps.helpers.games_grid_page': ( 'helpers.html#games_grid_page',
+                                                                                      'keybindings_fps/helpers.py'),
+                                         'keybindings_fps.helpers.get_games_page': ( 'helpers.html#get_games_page',
+                                                                                     'keybindings_fps/helpers.py'),
                                          'keybindings_fps.helpers.get_project_root': ( 'helpers.html#get_project_root',
                                                                                        'keybindings_fps/helpers.py'),
+                                         'keybindings_fps.helpers.image_mime_type': ( 'helpers.html#image_mime_type',
+                                                                                      'keybindings_fps/helpers.py'),
                                          'keybindings_fps.helpers.nav': ('helpers.html#nav', 'keybindings_fps/helpers.py')},
-            'keybindings_fps.manipulate_db_contents': { 'keybindings_fps.manipulate_db_contents.add_binding': ( 'manipulate_db_contents.html#add_binding',
+            'keybindings_fps.import_export': { 'keybindings_fps.import_export.NameResolver': ( 'import_export.html#nameresolver',
+                                                                                               'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.NameResolver.__init__': ( 'import_export.html#nameresolver.__init__',
+                                                                                                        'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.NameResolver._query': ( 'import_export.html#nameresolver._query',
+                                                                                                      'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.NameResolver.resolve': ( 'import_export.html#nameresolver.resolve',
+                                                                                                       'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.NameResolver.resolve_actions': ( 'import_export.html#nameresolver.resolve_actions',
+                                                                                                               'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.export_bindings': ( 'import_export.html#export_bindings',
+                                                                                                  'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.export_cli': ( 'import_export.html#export_cli',
+                                                                                             'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.export_lines': ( 'import_export.html#export_lines',
+                                                                                               'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.import_bindings': ( 'import_export.html#import_bindings',
+                                                                                                  'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.import_cli': ( 'import_export.html#import_cli',
+                                                                                             'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.import_file': ( 'import_export.html#import_file',
+                                                                                              'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.iter_bindings': ( 'import_export.html#iter_bindings',
+                                                                                                'keybindings_fps/import_export.py'),
+                                               'keybindings_fps.import_export.read_bindings': ( 'import_export.html#read_bindings',
+                                                                                                'keybindings_fps/import_export.py')},
+            'keybindings_fps.manipulate_db_contents': { 'keybindings_fps.manipulate_db_contents.Catalog': ( 'manipulate_db_contents.html#catalog',
+                                                                                                            'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.Catalog.__init__': ( 'manipulate_db_contents.html#catalog.__init__',
+                                                                                                                     'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.Catalog._add': ( 'manipulate_db_contents.html#catalog._add',
+                                                                                                                 'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.Catalog._copy': ( 'manipulate_db_contents.html#catalog._copy',
+                                                                                                                  'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.Catalog.clear': ( 'manipulate_db_contents.html#catalog.clear',
+                                                                                                                  'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.Catalog.id': ( 'manipulate_db_contents.html#catalog.id',
+                                                                                                               'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.Catalog.row': ( 'manipulate_db_contents.html#catalog.row',
+                                                                                                                'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.Catalog.rows': ( 'manipulate_db_contents.html#catalog.rows',
+                                                                                                                 'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex': ( 'manipulate_db_contents.html#conflictindex',
+                                                                                                                  'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex.__init__': ( 'manipulate_db_contents.html#conflictindex.__init__',
+                                                                                                                           'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex._add': ( 'manipulate_db_contents.html#conflictindex._add',
+                                                                                                                       'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex._build': ( 'manipulate_db_contents.html#conflictindex._build',
+                                                                                                                         'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex._index': ( 'manipulate_db_contents.html#conflictindex._index',
+                                                                                                                         'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex._remove': ( 'manipulate_db_contents.html#conflictindex._remove',
+                                                                                                                          'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex._update_conflicts': ( 'manipulate_db_contents.html#conflictindex._update_conflicts',
+                                                                                                                                    'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex.binding_changed': ( 'manipulate_db_contents.html#conflictindex.binding_changed',
+                                                                                                                                  'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex.clashes': ( 'manipulate_db_contents.html#conflictindex.clashes',
+                                                                                                                          'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex.clear': ( 'manipulate_db_contents.html#conflictindex.clear',
+                                                                                                                        'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.ConflictIndex.conflicts': ( 'manipulate_db_contents.html#conflictindex.conflicts',
+                                                                                                                            'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.WriteQueue': ( 'manipulate_db_contents.html#writequeue',
+                                                                                                               'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.WriteQueue.__init__': ( 'manipulate_db_contents.html#writequeue.__init__',
+                                                                                                                        'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.WriteQueue._begin': ( 'manipulate_db_contents.html#writequeue._begin',
+                                                                                                                      'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.WriteQueue._commit': ( 'manipulate_db_contents.html#writequeue._commit',
+                                                                                                                       'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.WriteQueue._run': ( 'manipulate_db_contents.html#writequeue._run',
+                                                                                                                    'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.WriteQueue.close': ( 'manipulate_db_contents.html#writequeue.close',
+                                                                                                                     'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.WriteQueue.submit': ( 'manipulate_db_contents.html#writequeue.submit',
+                                                                                                                      'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.WriteQueue.write': ( 'manipulate_db_contents.html#writequeue.write',
+                                                                                                                     'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents._bump': ( 'manipulate_db_contents.html#_bump',
+                                                                                                          'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents._check_image_size': ( 'manipulate_db_contents.html#_check_image_size',
+                                                                                                                      'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents._pending_revision': ( 'manipulate_db_contents.html#_pending_revision',
+                                                                                                                      'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents._store_revision': ( 'manipulate_db_contents.html#_store_revision',
+                                                                                                                    'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents._sync_revisions': ( 'manipulate_db_contents.html#_sync_revisions',
+                                                                                                                    'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.add_binding': ( 'manipulate_db_contents.html#add_binding',
                                                                                                                 'keybindings_fps/manipulate_db_contents.py'),
                                                         'keybindings_fps.manipulate_db_contents.add_new_action': ( 'manipulate_db_contents.html#add_new_action',
                                                                                                                    'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.bump_revision': ( 'manipulate_db_contents.html#bump_revision',
+                                                                                                                  'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.clone_bindings': ( 'manipulate_db_contents.html#clone_bindings',
+                                                                                                                   'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.close_image_client': ( 'manipulate_db_contents.html#close_image_client',
+                                                                                                                       'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.compare_all_with_default': ( 'manipulate_db_contents.html#compare_all_with_default',
+                                                                                                                             'keybindings_fps/manipulate_db_contents.py'),
                                                         'keybindings_fps.manipulate_db_contents.compare_with_default': ( 'manipulate_db_contents.html#compare_with_default',
                                                                                                                          'keybindings_fps/manipulate_db_contents.py'),
                                                         'keybindings_fps.manipulate_db_contents.copy_default_bindings': ( 'manipulate_db_contents.html#copy_default_bindings',
                                                                                                                           'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.deferred_revisions': ( 'manipulate_db_contents.html#deferred_revisions',
+                                                                                                                       'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.delete_binding': ( 'manipulate_db_contents.html#delete_binding',
+                                                                                                                   'keybindings_fps/manipulate_db_contents.py'),
                                                         'keybindings_fps.manipulate_db_contents.delete_game': ( 'manipulate_db_contents.html#delete_game',
                                                                                                                 'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.download_image': ( 'manipulate_db_contents.html#download_image',
+                                                                                                                   'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.fetch_image': ( 'manipulate_db_contents.html#fetch_image',
+                                                                                                                'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.game_image_digest': ( 'manipulate_db_contents.html#game_image_digest',
+                                                                                                                      'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.game_revision': ( 'manipulate_db_contents.html#game_revision',
+                                                                                                                  'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.image_client': ( 'manipulate_db_contents.html#image_client',
+                                                                                                                 'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.insert_binding': ( 'manipulate_db_contents.html#insert_binding',
+                                                                                                                   'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.reorder_bindings': ( 'manipulate_db_contents.html#reorder_bindings',
+                                                                                                                     'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.reset_game_bindings': ( 'manipulate_db_contents.html#reset_game_bindings',
+                                                                                                                        'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.store_game_image': ( 'manipulate_db_contents.html#store_game_image',
+                                                                                                                     'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.stored_revision': ( 'manipulate_db_contents.html#stored_revision',
+                                                                                                                    'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.update_binding': ( 'manipulate_db_contents.html#update_binding',
+                                                                                                                   'keybindings_fps/manipulate_db_contents.py'),
+                                                        'keybindings_fps.manipulate_db_contents.update_game_image': ( 'manipulate_db_contents.html#update_game_image',
+                                                                                                                      'keybindings_fps/manipulate_db_contents.py'),
                                                         'keybindings_fps.manipulate_db_contents.upsert_game': ( 'manipulate_db_contents.html#upsert_game',
                                                                                                                 'keybindings_fps/manipulate_db_contents.py')},
+            'keybindings_fps.metrics': { 'keybindings_fps.metrics.Histogram': ('metrics.html#histogram', 'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.Histogram.__init__': ( 'metrics.html#histogram.__init__',
+                                                                                         'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.Histogram.lines': ( 'metrics.html#histogram.lines',
+                                                                                      'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.Histogram.observe': ( 'metrics.html#histogram.observe',
+                                                                                        'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.MetricsMiddleware': ( 'metrics.html#metricsmiddleware',
+                                                                                        'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.MetricsMiddleware.__call__': ( 'metrics.html#metricsmiddleware.__call__',
+                                                                                                 'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.MetricsMiddleware.__init__': ( 'metrics.html#metricsmiddleware.__init__',
+                                                                                                 'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.RouteMetrics': ( 'metrics.html#routemetrics',
+                                                                                   'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.RouteMetrics.__init__': ( 'metrics.html#routemetrics.__init__',
+                                                                                            'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.RouteMetrics.middleware': ( 'metrics.html#routemetrics.middleware',
+                                                                                              'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.RouteMetrics.observe': ( 'metrics.html#routemetrics.observe',
+                                                                                           'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.RouteMetrics.render': ( 'metrics.html#routemetrics.render',
+                                                                                          'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.RouteMetrics.response': ( 'metrics.html#routemetrics.response',
+                                                                                            'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.RouteMetrics.track_queries': ( 'metrics.html#routemetrics.track_queries',
+                                                                                                 'keybindings_fps/metrics.py'),
+                                         'keybindings_fps.metrics.route_template': ( 'metrics.html#route_template',
+                                                                                     'keybindings_fps/metrics.py')},
             'keybindings_fps.populate_db_defaults': { 'keybindings_fps.populate_db_defaults.create_default_game': ( 'populate_db_defaults.html#create_default_game',
                                                                                                                     'keybindings_fps/populate_db_defaults.py'),
+                                                      'keybindings_fps.populate_db_defaults.name_to_id': ( 'populate_db_defaults.html#name_to_id',
+                                                                                                           'keybindings_fps/populate_db_defaults.py'),
                                                       'keybindings_fps.populate_db_defaults.populate_actions': ( 'populate_db_defaults.html#populate_actions',
                                                                                                                  'keybindings_fps/populate_db_defaults.py'),
                                                       'keybindings_fps.populate_db_defaults.populate_categories': ( 'populate_db_defaults.html#populate_categories',
@@ -57,4 +407,56 @@ d = { 'settings': { 'branch': 'main',
                                                       'keybindings_fps.populate_db_defaults.populate_modifiers': ( 'populate_db_defaults.html#populate_modifiers',
                                                                                                                    'keybindings_fps/populate_db_defaults.py'),
                                                       'keybindings_fps.populate_db_defaults.setup_fresh_db': ( 'populate_db_defaults.html#setup_fresh_db',
-                                                                                                               'keybindings_fps/populate_db_defaults.py')}}}
+                                                                                                               'keybindings_fps/populate_db_defaults.py')},
+            'keybindings_fps.print_export': { 'keybindings_fps.print_export._export_game': ( 'print_export.html#_export_game',
+                                                                                             'keybindings_fps/print_export.py'),
+                                              'keybindings_fps.print_export._init_worker': ( 'print_export.html#_init_worker',
+                                                                                             'keybindings_fps/print_export.py'),
+                                              'keybindings_fps.print_export.export_print_layouts': ( 'print_export.html#export_print_layouts',
+                                                                                                     'keybindings_fps/print_export.py'),
+                                              'keybindings_fps.print_export.find_pdf_converter': ( 'print_export.html#find_pdf_converter',
+                                                                                                   'keybindings_fps/print_export.py'),
+                                              'keybindings_fps.print_export.game_filename': ( 'print_export.html#game_filename',
+                                                                                              'keybindings_fps/print_export.py'),
+                                              'keybindings_fps.print_export.game_stamps': ( 'print_export.html#game_stamps',
+                                                                                            'keybindings_fps/print_export.py'),
+                                              'keybindings_fps.print_export.html_to_pdf': ( 'print_export.html#html_to_pdf',
+                                                                                            'keybindings_fps/print_export.py'),
+                                              'keybindings_fps.print_export.print_export_cli': ( 'print_export.html#print_export_cli',
+                                                                                                 'keybindings_fps/print_export.py'),
+                                              'keybindings_fps.print_export.standalone_html': ( 'print_export.html#standalone_html',
+                                                                                                'keybindings_fps/print_export.py')},
+            'keybindings_fps.sql_profiler': { 'keybindings_fps.sql_profiler.SQLProfiler': ( 'sql_profiler.html#sqlprofiler',
+                                                                                            'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler.__init__': ( 'sql_profiler.html#sqlprofiler.__init__',
+                                                                                                     'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler._drain': ( 'sql_profiler.html#sqlprofiler._drain',
+                                                                                                   'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler._merge': ( 'sql_profiler.html#sqlprofiler._merge',
+                                                                                                   'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler._statements': ( 'sql_profiler.html#sqlprofiler._statements',
+                                                                                                        'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler.clear': ( 'sql_profiler.html#sqlprofiler.clear',
+                                                                                                  'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler.explain': ( 'sql_profiler.html#sqlprofiler.explain',
+                                                                                                    'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler.html': ( 'sql_profiler.html#sqlprofiler.html',
+                                                                                                 'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler.install': ( 'sql_profiler.html#sqlprofiler.install',
+                                                                                                    'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler.middleware': ( 'sql_profiler.html#sqlprofiler.middleware',
+                                                                                                       'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler.report': ( 'sql_profiler.html#sqlprofiler.report',
+                                                                                                   'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfiler.response': ( 'sql_profiler.html#sqlprofiler.response',
+                                                                                                     'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfilerMiddleware': ( 'sql_profiler.html#sqlprofilermiddleware',
+                                                                                                      'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfilerMiddleware.__call__': ( 'sql_profiler.html#sqlprofilermiddleware.__call__',
+                                                                                                               'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.SQLProfilerMiddleware.__init__': ( 'sql_profiler.html#sqlprofilermiddleware.__init__',
+                                                                                                               'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.full_scans': ( 'sql_profiler.html#full_scans',
+                                                                                           'keybindings_fps/sql_profiler.py'),
+                                              'keybindings_fps.sql_profiler.normalize_sql': ( 'sql_profiler.html#normalize_sql',
+                                                                                              'keybindings_fps/sql_profiler.py')}}}
@@ -0,0 +1,86 @@
+"""Async access to the database for the routes, so a slow query, write or image download doesn't hold up the requests of other users."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/11_async_db.ipynb.
+
+# %% auto 0
+__all__ = ['AsyncDB']
+
+# %% ../nbs/11_async_db.ipynb 3
+import asyncio, contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from fastcore.test import *
+from fasthtml.common import *
+
+from .create_db_structure import *
+from .manipulate_db_contents import *
+
+# %% ../nbs/11_async_db.ipynb 5
+def _add_game(db, name, game_type):
+    game = upsert_game(db, name, game_type)
+    copy_default_bindings(db, name)
+    return game
+
+class AsyncDB:
+    """Awaitable database access: reads run in a bounded thread pool, writes go through a `WriteQueue`"""
+    def __init__(self, factory: ConnectionFactory = None, # Connections of the reads, a factory for the project database when None
+                 writes: WriteQueue = None, # Queue of the writes, a new one on `factory` when None
+                 max_workers: int = 8 # Most reads that run at the same time
+                 ):
+        self.factory = factory or ConnectionFactory()
+        self.writes = writes or WriteQueue(self.factory)
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix='db-read')
+
+    def _call(self, fn, args, kwargs):
+        if self.factory.mode == 'pool':
+            with self.factory.connection() as db: return fn(db, *args, **kwargs)
+        return fn(self.factory.current(), *args, **kwargs)
+
+    async def read(self, fn, *args, **kwargs):
+        """Run `fn(db, *args, **kwargs)` in the thread pool and return its result"""
+        call = partial(contextvars.copy_context().run, self._call, fn, args, kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+
+    async def write(self, fn, *args, **kwargs):
+        """Run `fn(db, *args, **kwargs)` on the writer thread and return its result after the commit"""
+        return await asyncio.wrap_future(self.writes.submit(fn, *args, **kwargs))
+
+    # Games
+    async def game(self, game_id: int) -> dict: return await self.read(lambda db: db.t.games[game_id])
+
+    async def add_game(self, name: str, game_type: str, image_url: str = None) -> dict:
+        """Add a game with the default bindings, and then download and store its image"""
+        game = await self.write(_add_game, name, game_type)
+        if image_url: await self.update_game_image(game['id'], image_url)
+        return game
+
+    async def update_game_image(self, game_id: int, image_url: str):
+        return await update_game_image(None, game_id, image_url, writes=self.writes)
+
+    async def delete_game(self, game_id: int) -> str: return await self.write(delete_game, game_id)
+
+    async def copy_default_bindings(self, game_name: str): return await self.write(copy_default_bindings, game_name)
+
+    async def reset_game_bindings(self, game_id: int) -> list: return await self.write(reset_game_bindings, game_id)
+
+    # Bindings
+    async def binding(self, binding_id: int) -> dict: return await self.read(lambda db: db.t.bindings[binding_id])
+
+    async def add_binding(self, game_id: int, action_id: int, key_id: int, modifier_id: int, description: str = None) -> tuple:
+        return await self.write(insert_binding, game_id, action_id, key_id, modifier_id, description)
+
+    async def update_binding(self, binding_id: int, key_id: int, modifier_id: int, description: str = None) -> tuple:
+        return await self.write(update_binding, binding_id, key_id, modifier_id, description)
+
+    async def delete_binding(self, binding_id: int) -> dict: return await self.write(delete_binding, binding_id)
+
+    async def reorder_bindings(self, game_id: int, binding_ids: list) -> int:
+        return await self.write(reorder_bindings, game_id, binding_ids)
+
+    # Actions
+    async def add_action(self, name: str, category: str, default_keybinding: str, default_modifier: str):
+        return await self.write(add_new_action, name, category, default_keybinding, default_modifier)
+
+    def close(self):
+        """Finish the running reads and stop the thread pool"""
+        self._pool.shutdown()
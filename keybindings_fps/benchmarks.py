@@ -0,0 +1,236 @@
+"""Build synthetic databases at scale and time the core functions and the routes of the app, so performance regressions can be caught by comparing against a baseline."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/05_benchmarks.ipynb.
+
+# %% auto 0
+__all__ = ['build_synthetic_db', 'count_queries', 'measure', 'bench_functions', 'bench_routes', 'run_benchmarks',
+           'compare_results', 'benchmark']
+
+# %% ../nbs/05_benchmarks.ipynb 3
+import sys, json, time, statistics, tracemalloc, importlib
+from contextlib import contextmanager
+from pathlib import Path
+from fastcore.script import call_parse
+from fastcore.test import *
+from fasthtml.common import *
+from starlette.testclient import TestClient
+
+from .create_db_structure import *
+from .manipulate_db_contents import *
+from .gui_binding_tables import *
+from .async_db import AsyncDB
+
+# %% ../nbs/05_benchmarks.ipynb 5
+def build_synthetic_db(data_dir: Path, # Directory for the game_bindings.db file, an existing database is replaced
+                       games: int = 100, # Number of games besides the default template
+                       bindings: int = 100, # Number of actions, every game has one binding per action
+                       categories: int = 10 # Number of action categories
+                       ):
+    """Build a synthetic database at the given scale with the schema of `create_tables`"""
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for f in data_dir.glob('game_bindings.db*'): f.unlink()
+
+    db = init_db(data_dir)
+    with db.conn:
+        create_tables(db)
+        db.t.categories.insert_all(dict(name=f'category {i}', description=f'Synthetic category {i}') for i in range(categories))
+        db.t.modifiers.insert_all(dict(name=name) for name in ['tap', 'hold', 'scroll', 'double_tap'])
+        db.t.game_keys.insert_all(dict(name=f'key {i}') for i in range(100))
+        db.t.actions.insert_all(dict(name=f'action {i}', category_id=i % categories + 1) for i in range(bindings))
+        db.t.games.insert_all([dict(name='default', game_type='template')] +
+                              [dict(name=f'game {i:06d}', game_type='tactical') for i in range(games)])
+        db.t.bindings.insert_all(dict(game_id=1, action_id=i + 1, key_id=i % 100 + 1, modifier_id=i % 4 + 1, sort_order=i)
+                                 for i in range(bindings))
+        # Every game starts from the default bindings with about a fifth of them bound to another key
+        db.execute("""
+            INSERT INTO bindings (game_id, action_id, key_id, modifier_id, description, sort_order)
+            SELECT g.id, b.action_id,
+                   CASE WHEN (g.id + b.action_id) % 5 = 0 THEN (b.key_id + g.id) % 100 + 1 ELSE b.key_id END,
+                   b.modifier_id, b.description, b.sort_order
+            FROM games g JOIN bindings b ON b.game_id = 1
+            WHERE g.id > 1 ORDER BY g.id, b.id""")
+    bump_revision(db)
+    return db
+
+# %% ../nbs/05_benchmarks.ipynb 7
+@contextmanager
+def count_queries(db):
+    """Count the SQL statements that run on the connection of `db`, or on every connection of a `ConnectionFactory`.
+    The count is the first item of the yielded list."""
+    counter, traced, active = [0], [], True
+    def install(db):
+        if not active: return
+        previous = db.conn.exec_trace
+        def trace(cursor, sql, bindings):
+            counter[0] += 1
+            return previous(cursor, sql, bindings) if previous else True
+        db.conn.exec_trace = trace
+        traced.append((db.conn, previous))
+    # The connections of a factory include the ones it makes while counting
+    if isinstance(db, ConnectionFactory): db.on_connect(install)
+    else: install(db)
+    try: yield counter
+    finally:
+        active = False
+        for conn, previous in traced: conn.exec_trace = previous
+
+# %% ../nbs/05_benchmarks.ipynb 8
+def measure(db, # Database or `ConnectionFactory` the queries are counted on
+            fn, # Function to measure, called without arguments
+            repeat: int = 5, # Number of timed calls
+            setup = None # Called before every call of `fn`, without being measured
+            ):
+    """Time `fn`, and count its queries and the peak memory it allocates"""
+    timings = []
+    for _ in range(repeat):
+        if setup: setup()
+        with count_queries(db) as queries:
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate call, because tracing slows everything down
+    if setup: setup()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return dict(min_s=min(timings), median_s=statistics.median(timings), queries=queries[0], peak_bytes=peak)
+
+# %% ../nbs/05_benchmarks.ipynb 10
+def bench_functions(db, # Synthetic database, see `build_synthetic_db`
+                    app = None, # Module with the app, needed for `create_edit_screen`
+                    repeat: int = 5 # Number of timed calls per function
+                    ):
+    """Time the core functions on the last game of the database"""
+    game = next(db.t.games.rows_where("name != ? ORDER BY id DESC LIMIT 1", ["default"]))
+    action, key = db.t.actions()[0]['name'], db.t.game_keys()[0]['name']
+    clear_cache = binding_tables_cache.clear
+
+    results = {
+        'add_binding': measure(db, lambda: add_binding(db, game['name'], action, key), repeat),
+        'copy_default_bindings': measure(db, lambda: copy_default_bindings(db, game['name']), repeat),
+        'compare_with_default': measure(db, lambda: compare_with_default(db, game['name']), repeat),
+        'compare_all_with_default': measure(db, lambda: compare_all_with_default(db), repeat),
+        'create_bindings_table': measure(db, lambda: create_bindings_table(db, game['id']), repeat, clear_cache),
+        'create_bindings_table (cached)': measure(db, lambda: create_bindings_table(db, game['id']), repeat),
+        'create_bindings_table_print': measure(db, lambda: create_bindings_table_print(db, game['id']), repeat, clear_cache),
+    }
+    if app is not None:
+        binding = next(db.t.bindings.rows_where("game_id = ? LIMIT 1", [game['id']]))
+        results['create_edit_screen'] = measure(db, lambda: app.create_edit_screen(db, binding['id']), repeat)
+    return results
+
+# %% ../nbs/05_benchmarks.ipynb 12
+def bench_routes(app, # Module with the app, like `main`, its `data` and `writes` are replaced by ones on the synthetic database
+                 db, # Synthetic database, see `build_synthetic_db`
+                 repeat: int = 5 # Number of timed requests per route
+                 ):
+    """Time every route of the app through an in-process test client"""
+    # The routes read and write through `data`, give them their own connections to the synthetic database
+    factory = ConnectionFactory(Path(db.conn.filename).parent, mode='pool')
+    writes = WriteQueue(factory)
+    original = app.data, app.writes
+    app.data, app.writes = AsyncDB(factory, writes), writes
+    try: return _bench_routes(app, db, factory, repeat)
+    finally:
+        app.data, app.writes = original
+        writes.close(); factory.close()
+
+def _bench_routes(app, db, factory, repeat):
+    client = TestClient(app.app)
+    game = next(db.t.games.rows_where("name != ? ORDER BY id DESC LIMIT 1", ["default"]))
+    binding = next(db.t.bindings.rows_where("game_id = ? ORDER BY id LIMIT 1", [game['id']]))
+    category_id = db.t.actions[binding['action_id']]['category_id']
+    category_bindings = [b['id'] for b in db.q("""SELECT b.id FROM bindings b JOIN actions a ON a.id = b.action_id
+                                                  WHERE b.game_id = ? AND a.category_id = ?""", [game['id'], category_id])]
+    ids = dict(game_id=game['id'], id=binding['id'], action_category_id=category_id)
+
+    routes = [
+        ('get', '/', None),
+        ('get', '/games', None),
+        ('get', '/add_game', None),
+        ('get', '/add_action', None),
+        ('get', '/edit_actions', None),
+        ('get', '/settings', None),
+        ('get', '/game/{game_id}', None),
+        ('get', '/game/{game_id}/add_binding', None),
+        ('get', '/game/{game_id}/print_layout', None),
+        ('get', '/game/{game_id}/image', None),
+        ('get', '/binding/{id}/edit', None),
+        ('get', '/binding/{id}/cancel', None),
+        ('post', '/binding/{id}/update', dict(key_id=binding['key_id'], modifier_id=binding['modifier_id'], description='benchmark')),
+        ('post', '/game/{game_id}/reorder_bindings/{action_category_id}', dict(binding_id=category_bindings[::-1])),
+        # Copying replaces the binding ids, so it runs last
+        ('post', '/game/{game_id}/copy_defaults', None),
+    ]
+
+    results = {}
+    for method, route, data in routes:
+        path = route.format(**ids)
+        request = lambda: getattr(client, method)(path, data=data) if data else getattr(client, method)(path)
+        result = measure(factory, request, repeat)
+        response = request()
+        results[f"{method.upper()} {route}"] = dict(result, status=response.status_code, response_bytes=len(response.content))
+    return results
+
+# %% ../nbs/05_benchmarks.ipynb 14
+def run_benchmarks(data_dir: Path, # Directory for the synthetic database
+                   games: int = 100, # Number of games besides the default template
+                   bindings: int = 100, # Number of bindings per game
+                   categories: int = 10, # Number of action categories
+                   repeat: int = 5, # Number of timed calls per function or route
+                   app: str = None # Name of the module with the app, like 'main', to also time `create_edit_screen` and the routes
+                   ):
+    """Build a synthetic database and benchmark the core functions and, when an app is given, its routes"""
+    config = dict(games=games, bindings=bindings, categories=categories, repeat=repeat, app=app)
+    start = time.perf_counter()
+    db = build_synthetic_db(data_dir, games, bindings, categories)
+    results = dict(config=config, build_s=time.perf_counter() - start)
+
+    app_module = importlib.import_module(app) if app else None
+    results['functions'] = bench_functions(db, app_module, repeat)
+    if app_module is not None:
+        results['routes'] = bench_routes(app_module, db, repeat)
+    return results
+
+# %% ../nbs/05_benchmarks.ipynb 15
+def compare_results(results: dict, # Results of `run_benchmarks`
+                    baseline: dict, # Earlier results to compare with
+                    tolerance: float = 0.25 # Allowed relative slowdown of the median time
+                    ):
+    """List the functions and routes that got slower or run more queries than in the baseline"""
+    regressions = []
+    for group in ['functions', 'routes']:
+        for name, old in baseline.get(group, {}).items():
+            new = results.get(group, {}).get(name)
+            if new is None: continue
+            if new['median_s'] > old['median_s'] * (1 + tolerance):
+                regressions.append(f"{name}: median {old['median_s']*1000:.2f}ms -> {new['median_s']*1000:.2f}ms")
+            if new['queries'] > old['queries']:
+                regressions.append(f"{name}: queries {old['queries']} -> {new['queries']}")
+    return regressions
+
+# %% ../nbs/05_benchmarks.ipynb 16
+@call_parse
+def benchmark(out: str = 'benchmark.json', # Where to write the results as JSON
+              baseline: str = None, # JSON results of an earlier run, exits with an error on regressions
+              data_dir: str = 'bench_data', # Directory for the synthetic database
+              games: int = 100, # Number of games besides the default template
+              bindings: int = 100, # Number of bindings per game
+              categories: int = 10, # Number of action categories
+              repeat: int = 5, # Number of timed calls per function or route
+              app: str = 'main', # Module with the app, empty to skip the routes
+              tolerance: float = 0.25 # Allowed relative slowdown compared with the baseline
+              ):
+    "Benchmark the core functions and routes on a synthetic database"
+    results = run_benchmarks(Path(data_dir), games, bindings, categories, repeat, app or None)
+    Path(out).write_text(json.dumps(results, indent=2))
+    print(f"Wrote benchmark results to {out}")
+    if baseline:
+        regressions = compare_results(results, json.loads(Path(baseline).read_text()), tolerance)
+        for regression in regressions: print(regression)
+        if regressions: sys.exit(1)
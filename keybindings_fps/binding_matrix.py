@@ -0,0 +1,106 @@
+"""The bindings of all games as one dense array of packed key and modifier codes, for analysis over many games at once."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/09_binding_matrix.ipynb.
+
+# %% auto 0
+__all__ = ['BindingMatrix', 'matrix_diff', 'matrix_divergence', 'matrix_conflicts', 'key_usage', 'memory_footprint']
+
+# %% ../nbs/09_binding_matrix.ipynb 3
+import tracemalloc
+from array import array
+from collections import Counter
+from operator import ne
+from fastcore.test import *
+from fasthtml.common import *
+
+from .create_db_structure import *
+from .manipulate_db_contents import *
+
+# %% ../nbs/09_binding_matrix.ipynb 5
+class BindingMatrix:
+    """Games × actions matrix of packed (key_id, modifier_id) codes"""
+    __slots__ = ('game_ids', 'action_ids', 'codes', 'shift', '_rows', '_columns')
+
+    def __init__(self, game_ids: list, action_ids: list, codes: array, shift: int = 16):
+        self.game_ids, self.action_ids, self.codes, self.shift = game_ids, action_ids, codes, shift
+        self._rows = {game_id: i for i, game_id in enumerate(game_ids)}
+        self._columns = {action_id: i for i, action_id in enumerate(action_ids)}
+
+    @classmethod
+    def load(cls, db: database # Database connection
+             ) -> 'BindingMatrix':
+        """Build the matrix of all games and actions with one query over the bindings"""
+        game_ids = [g['id'] for g in db.q("SELECT id FROM games ORDER BY id")]
+        action_ids = [a['id'] for a in catalog.rows(db, 'actions')]
+        # Ids up to 65535 fit in 32-bit codes, larger ones need 64 bits
+        largest = max(db.q("SELECT max(coalesce(max(key_id), 0), coalesce(max(modifier_id), 0)) AS m FROM bindings")[0]['m'], 0)
+        typecode, shift = ('I', 16) if largest < 1 << 16 else ('Q', 32)
+        matrix = cls(game_ids, action_ids, array(typecode, bytes(array(typecode).itemsize * len(game_ids) * len(action_ids))), shift)
+
+        rows, columns, codes, width = matrix._rows, matrix._columns, matrix.codes, len(action_ids)
+        # The first binding in sort order is written last
+        for game_id, action_id, key_id, modifier_id in db.execute("""
+                SELECT game_id, action_id, key_id, modifier_id FROM bindings
+                WHERE key_id IS NOT NULL ORDER BY game_id, action_id, sort_order DESC, id DESC"""):
+            row, column = rows.get(game_id), columns.get(action_id)
+            if row is not None and column is not None: codes[row * width + column] = key_id << shift | (modifier_id or 0)
+        return matrix
+
+    def pack(self, key_id: int, modifier_id: int) -> int: return key_id << self.shift | (modifier_id or 0)
+    def unpack(self, code: int) -> tuple: return code >> self.shift, code & ((1 << self.shift) - 1)
+
+    def row(self, game_id: int) -> memoryview:
+        """The codes of a game, one per action, without copying"""
+        width = len(self.action_ids)
+        start = self._rows[game_id] * width
+        return memoryview(self.codes)[start:start + width]
+
+    def rows(self):
+        for game_id in self.game_ids: yield game_id, self.row(game_id)
+
+    @property
+    def nbytes(self) -> int: return self.codes.itemsize * len(self.codes)
+
+# %% ../nbs/09_binding_matrix.ipynb 7
+def matrix_diff(matrix: BindingMatrix, game_id: int, other_game_id: int) -> list:
+    """Ids of the actions that are bound differently in the two games"""
+    return [action_id for action_id, a, b in zip(matrix.action_ids, matrix.row(game_id), matrix.row(other_game_id)) if a != b]
+
+def matrix_divergence(matrix: BindingMatrix, reference_game_id: int) -> dict:
+    """Per game the number of actions that are bound differently from the reference game"""
+    reference = matrix.row(reference_game_id).tolist()
+    return {game_id: sum(map(ne, row, reference)) for game_id, row in matrix.rows()}
+
+def matrix_conflicts(matrix: BindingMatrix) -> dict:
+    """Per game the number of actions whose key and modifier are already used by another action of the game"""
+    result = {}
+    for game_id, row in matrix.rows():
+        bound = [code for code in row if code]
+        result[game_id] = len(bound) - len(set(bound))
+    return result
+
+def key_usage(matrix: BindingMatrix, with_modifier: bool = False) -> Counter:
+    """How often every key id, or (key_id, modifier_id) pair, is bound over all games and actions"""
+    codes = Counter(matrix.codes)
+    codes.pop(0, None)
+    usage = Counter()
+    for code, count in codes.items():
+        key_id, modifier_id = matrix.unpack(code)
+        usage[(key_id, modifier_id) if with_modifier else key_id] += count
+    return usage
+
+# %% ../nbs/09_binding_matrix.ipynb 10
+def _retained_bytes(build):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally: tracemalloc.stop()
+
+def memory_footprint(db: database) -> dict:
+    """Bytes kept alive by the binding matrix and by the dicts of `rows_where` for all games"""
+    matrix_bytes, matrix = _retained_bytes(lambda: BindingMatrix.load(db))
+    dict_bytes, games = _retained_bytes(lambda: {game_id: list(db.t.bindings.rows_where("game_id = ?", [game_id])) for game_id in matrix.game_ids})
+    return dict(games=len(matrix.game_ids), actions=len(matrix.action_ids), bindings=sum(map(len, games.values())),
+                matrix_bytes=matrix_bytes, dict_bytes=dict_bytes, ratio=round(dict_bytes / max(matrix_bytes, 1), 1))
@@ -3,9 +3,15 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/00_create_db_structure.ipynb.
 
 # %% auto 0
-__all__ = ['init_db', 'create_tables', 'add_clmn_to_table', 'drop_clmn_from_table']
+__all__ = ['pragma_profiles', 'init_db', 'apply_pragmas', 'create_indexes', 'create_revisions_table', 'image_digest',
+           'create_image_digests', 'create_search_index', 'ConnectionFactory', 'DatabaseProxy', 'ConnectionMiddleware',
+           'create_tables', 'add_clmn_to_table', 'drop_clmn_from_table']
 
 # %% ../nbs/00_create_db_structure.ipynb 3
+import queue, threading
+from hashlib import sha256
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
 from typing import Optional
 from fastcore.test import *
@@ -14,18 +20,281 @@ from fasthtml.common import *
 from .helpers import get_project_root
 
 # %% ../nbs/00_create_db_structure.ipynb 5
-def init_db(data_dir: Path = None):
+def init_db(data_dir: Path = None, pragmas = None):
     # TODO: Add to logging
     """Initialize the database connection
     Args:
         data_dir: Optional path to data directory. If None, uses project's data dir
+        pragmas: Optional name of a profile in `pragma_profiles` or a dict of pragmas to set on the connection
     """
     if data_dir is None:
         data_dir = get_project_root() / 'data'
     data_dir.mkdir(exist_ok=True)
-    return database(data_dir / 'game_bindings.db')
+    db = database(data_dir / 'game_bindings.db')
+    if pragmas: apply_pragmas(db, pragmas)
+    # Upgrade existing databases that were created before the indexes, the revisions, the search and the image digests were added
+    create_indexes(db)
+    create_revisions_table(db)
+    create_search_index(db)
+    create_image_digests(db)
+    return db
 
-# %% ../nbs/00_create_db_structure.ipynb 10
+# %% ../nbs/00_create_db_structure.ipynb 6
+pragma_profiles = dict(
+    # The SQLite defaults
+    default = {},
+    # Readers don't block the writer, commits don't wait for the disk and more of the database is kept in memory
+    wal = dict(journal_mode='WAL', synchronous='NORMAL', busy_timeout=5000, cache_size=-64_000,
+               mmap_size=256 * 1024 * 1024, temp_store='MEMORY'),
+)
+
+def apply_pragmas(db: database, # Database connection
+                  pragmas # Name of a profile in `pragma_profiles` or a dict of pragmas
+                  ):
+    """Set the pragmas on the connection"""
+    if isinstance(pragmas, str): pragmas = pragma_profiles[pragmas]
+    for name, value in pragmas.items():
+        list(db.execute(f"PRAGMA {name} = {value}"))
+
+# %% ../nbs/00_create_db_structure.ipynb 7
+@contextmanager
+def _upgrading(db: database):
+    """Transaction of a schema upgrade. It takes the write lock right away, so of several workers that start together only the first upgrades,
+    the others have to check again once they hold the lock."""
+    if not db.conn.getautocommit():
+        # The caller's transaction already decides what is committed together
+        with db.conn: yield
+        return
+    db.execute("BEGIN IMMEDIATE")
+    try: yield
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
+
+def create_indexes(db: database # Database connection
+                   ):
+    """Create the secondary indexes and the unique indexes on the `name` columns.
+    Safe to run on an existing database: existing indexes and missing tables are skipped."""
+    indexes = {
+        'bindings': [['game_id', 'action_id', 'sort_order'], ['key_id', 'modifier_id']],
+        'actions': [['name'], ['category_id']],
+    }
+    for table, columns in indexes.items():
+        if table not in db.t: continue
+        for cols in columns:
+            db.t[table].create_index(cols, if_not_exists=True)
+
+    # Action names are not unique, the seed data already has 'Special' in two categories
+    for table in ['categories', 'games', 'game_keys', 'modifiers']:
+        if table not in db.t: continue
+        duplicates = db.q(f"SELECT name FROM {table} GROUP BY name HAVING COUNT(*) > 1")
+        if duplicates:
+            print(f"Duplicate names in table {table}: {[d['name'] for d in duplicates]}, creating a non-unique index")
+        db.t[table].create_index(['name'], unique=not duplicates, if_not_exists=True)
+
+def create_revisions_table(db: database # Database connection
+                           ):
+    """Create the table with the revision of every game, and of the shared tables under game id 0, see `bump_revision`.
+    Safe to run on an existing database."""
+    if 'revisions' in db.t: return
+    # Another worker may create the table while this one waits for the lock
+    with _upgrading(db):
+        db.execute("""CREATE TABLE IF NOT EXISTS revisions (
+                          game_id INTEGER PRIMARY KEY,
+                          revision INTEGER NOT NULL,
+                          modified REAL NOT NULL)""")
+        db.execute("INSERT OR IGNORE INTO revisions VALUES (0, 0, 0)")
+    # Every new connection analyzes the tables without statistics, which needs the write lock
+    db.execute("ANALYZE revisions")
+
+def image_digest(image: bytes) -> str:
+    """SHA-256 of an image, as stored in `games.image_sha256`"""
+    return sha256(image).hexdigest() if image else None
+
+def create_image_digests(db: database # Database connection
+                         ):
+    """Add the `image_sha256` column to the games, so the image of a game can be revalidated without reading it.
+    Safe to run on an existing database: the digests of the existing images are computed once."""
+    if 'games' not in db.t: return
+    def missing():
+        return 'image_sha256' not in db.t.games.c, not db.q("SELECT name FROM sqlite_master WHERE name = 'games_image_sha256'")
+    add, create = missing()
+    if not add and not create: return
+    with _upgrading(db):
+        # Another worker may have added the column while this one waited for the lock
+        add = missing()[0]
+        if add:
+            db.t.games.add_column('image_sha256', str)
+            for game_id, image in db.execute("SELECT id, image FROM games WHERE image IS NOT NULL").fetchall():
+                db.execute("UPDATE games SET image_sha256 = ? WHERE id = ?", [image_digest(image), game_id])
+        # A write of the image that doesn't store its digest as well leaves none, instead of the digest of the previous image
+        db.execute("""CREATE TRIGGER IF NOT EXISTS games_image_sha256 AFTER UPDATE OF image ON games
+                      WHEN old.image IS NOT new.image AND new.image_sha256 IS old.image_sha256 BEGIN
+                          UPDATE games SET image_sha256 = NULL WHERE id = new.id;
+                      END""")
+
+# %% ../nbs/00_create_db_structure.ipynb 9
+# The names of the game, action and category of a binding, as they are indexed for the search
+_search_names = """(SELECT name FROM games WHERE id = {b}.game_id),
+                   (SELECT name FROM actions WHERE id = {b}.action_id),
+                   (SELECT c.name FROM actions a JOIN categories c ON c.id = a.category_id WHERE a.id = {b}.action_id)"""
+
+_search_triggers = {
+    'bindings_search_insert': f"""AFTER INSERT ON bindings BEGIN
+        INSERT INTO bindings_search (rowid, game, action, category, description)
+        VALUES (new.id, {_search_names.format(b='new')}, new.description);
+    END""",
+    'bindings_search_update': f"""AFTER UPDATE OF id, game_id, action_id, description ON bindings BEGIN
+        DELETE FROM bindings_search WHERE rowid = old.id;
+        INSERT INTO bindings_search (rowid, game, action, category, description)
+        VALUES (new.id, {_search_names.format(b='new')}, new.description);
+    END""",
+    'bindings_search_delete': """AFTER DELETE ON bindings BEGIN
+        DELETE FROM bindings_search WHERE rowid = old.id;
+    END""",
+    # Renames are rare, but change the rows of every binding of the game, action or category
+    'bindings_search_game': """AFTER UPDATE OF name ON games WHEN old.name IS NOT new.name BEGIN
+        UPDATE bindings_search SET game = new.name WHERE rowid IN (SELECT id FROM bindings WHERE game_id = new.id);
+    END""",
+    'bindings_search_action': """AFTER UPDATE OF name, category_id ON actions
+        WHEN old.name IS NOT new.name OR old.category_id IS NOT new.category_id BEGIN
+        UPDATE bindings_search SET action = new.name, category = (SELECT name FROM categories WHERE id = new.category_id)
+        WHERE rowid IN (SELECT id FROM bindings WHERE action_id = new.id);
+    END""",
+    'bindings_search_category': """AFTER UPDATE OF name ON categories WHEN old.name IS NOT new.name BEGIN
+        UPDATE bindings_search SET category = new.name
+        WHERE rowid IN (SELECT b.id FROM bindings b JOIN actions a ON a.id = b.action_id WHERE a.category_id = new.id);
+    END""",
+}
+
+def create_search_index(db: database # Database connection
+                        ):
+    """Create the full-text index `bindings_search` over the descriptions of the bindings and the names of their game, action and category,
+    and the triggers that keep it in sync with the tables. Safe to run on an existing database: the index is built once from the existing bindings."""
+    if 'bindings' not in db.t: return
+    def missing():
+        existing = {r['name'] for r in db.q("SELECT name FROM sqlite_master WHERE name GLOB 'bindings_search*'")}
+        return 'bindings_search' not in existing, [name for name in _search_triggers if name not in existing]
+    create, triggers = missing()
+    if not create and not triggers: return
+    with _upgrading(db):
+        # Another worker may have upgraded the database while this one waited for the lock
+        create, triggers = missing()
+        if create:
+            # Prefix indexes make searching while typing fast, matches in action names rank highest
+            db.execute("""CREATE VIRTUAL TABLE bindings_search USING fts5(
+                              game, action, category, description,
+                              tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')""")
+            db.execute("INSERT INTO bindings_search (bindings_search, rank) VALUES ('rank', 'bm25(2.0, 4.0, 1.0, 2.0)')")
+            db.execute(f"""INSERT INTO bindings_search (rowid, game, action, category, description)
+                           SELECT b.id, {_search_names.format(b='b')}, b.description FROM bindings b""")
+        for name in triggers:
+            db.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {_search_triggers[name]}")
+    if create:
+        # Every new connection analyzes the tables without statistics, which needs the write lock
+        for table in db.q("SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'bindings_search_*'"):
+            db.execute(f"ANALYZE {table['name']}")
+
+# %% ../nbs/00_create_db_structure.ipynb 15
+_checked_out = ContextVar('checked_out', default=None)
+
+class ConnectionFactory:
+    """Connections to one database file, one per thread or from a pool of at most `pool_size` connections"""
+    def __init__(self, data_dir: Path = None, # Directory of the database, the data directory of the project when None
+                 pragmas = 'wal', # Name of a profile in `pragma_profiles` or a dict of pragmas
+                 mode: str = 'thread', # 'thread' for a connection per thread, 'pool' to check out a connection per request
+                 pool_size: int = 8,
+                 timeout: float = 30 # Seconds to wait for a free pooled connection
+                 ):
+        if mode not in ('thread', 'pool'): raise ValueError(f"Unknown mode '{mode}', use 'thread' or 'pool'")
+        self.data_dir, self.pragmas, self.mode, self.pool_size, self.timeout = data_dir, pragmas, mode, pool_size, timeout
+        self.hooks, self.connections = [], []
+        self._local, self._pool, self._lock, self._pooled = threading.local(), queue.LifoQueue(), threading.Lock(), 0
+        self.db = DatabaseProxy(self)
+
+    def connect(self) -> database:
+        """A new connection with the pragmas and the hooks applied"""
+        db = init_db(self.data_dir, self.pragmas)
+        with self._lock:
+            self.connections.append(db)
+            hooks = list(self.hooks)
+        for hook in hooks: hook(db)
+        return db
+
+    def on_connect(self, hook):
+        """Call `hook(db)` for every connection, the existing ones and the ones made later"""
+        with self._lock:
+            self.hooks.append(hook)
+            connections = list(self.connections)
+        for db in connections: hook(db)
+
+    def checkout(self) -> database:
+        """A connection from the pool, waits for one when all of them are in use"""
+        try: return self._pool.get_nowait()
+        except queue.Empty: pass
+        with self._lock:
+            create = self._pooled < self.pool_size
+            if create: self._pooled += 1
+        if create: return self.connect()
+        try: return self._pool.get(timeout=self.timeout)
+        except queue.Empty: raise TimeoutError(f"No free database connection within {self.timeout} seconds") from None
+
+    def release(self, db: database):
+        """Return a connection to the pool"""
+        self._pool.put(db)
+
+    @contextmanager
+    def connection(self):
+        """Check out a pooled connection for the duration of the block"""
+        db = self.checkout()
+        try: yield db
+        finally: self.release(db)
+
+    def current(self) -> database:
+        """The connection of the current request, or else of the current thread"""
+        checked_out = _checked_out.get()
+        if checked_out is not None:
+            if checked_out[0] is None: checked_out[0] = self.checkout()
+            return checked_out[0]
+        db = getattr(self._local, 'db', None)
+        if db is None: db = self._local.db = self.connect()
+        return db
+
+    def middleware(self):
+        """Middleware for `fast_app` that checks out a pooled connection per request, empty for thread-local connections"""
+        return [Middleware(ConnectionMiddleware, factory=self)] if self.mode == 'pool' else []
+
+    def close(self):
+        """Close all connections"""
+        with self._lock:
+            connections, self.connections = self.connections, []
+            self._local, self._pool, self._pooled = threading.local(), queue.LifoQueue(), 0
+        for db in connections: db.conn.close()
+
+# %% ../nbs/00_create_db_structure.ipynb 16
+class DatabaseProxy:
+    """Stands in for a `database` and forwards to the connection of the current request or thread of a `ConnectionFactory`"""
+    def __init__(self, factory): self._factory = factory
+    def __getattr__(self, name): return getattr(self._factory.current(), name)
+    def __repr__(self): return f"DatabaseProxy({self._factory.data_dir})"
+
+class ConnectionMiddleware:
+    """ASGI middleware that lends a request a pooled connection on its first database access, and returns it afterwards"""
+    def __init__(self, app, factory: ConnectionFactory):
+        self.app, self.factory = app, factory
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http': return await self.app(scope, receive, send)
+        checked_out = [None]
+        token = _checked_out.set(checked_out)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _checked_out.reset(token)
+            if checked_out[0] is not None: self.factory.release(checked_out[0])
+
+# %% ../nbs/00_create_db_structure.ipynb 19
 def create_tables(db: database, # Database connection
                   overwrite_existing: bool = False # Remove all existing data in database
                   ):
@@ -39,7 +308,7 @@ def create_tables(db: database, # Database connection
         replace=False
         transform=True
     
-    tables = ['categories', 'actions', 'games', 'game_keys', 'modifiers', 'bindings']
+    tables = ['bindings_search', 'categories', 'actions', 'games', 'game_keys', 'modifiers', 'bindings', 'revisions']
     
     # Drop tables if they exist
     for table in tables:
@@ -75,6 +344,7 @@ def create_tables(db: database, # Database connection
         name=str,
         game_type=str,
         image=bytes,
+        image_sha256=str,
         pk='id',
         not_null=['name'],
         transform=transform,
@@ -116,8 +386,12 @@ def create_tables(db: database, # Database connection
         replace=replace
     )
 
+    create_indexes(db)
+    create_revisions_table(db)
+    create_search_index(db)
+    create_image_digests(db)
 
-# %% ../nbs/00_create_db_structure.ipynb 17
+# %% ../nbs/00_create_db_structure.ipynb 28
 def add_clmn_to_table(db, table, column, col_type, **kwargs):
     """Add a new column to an existing table"""
     if column in db.t[table].c:
@@ -125,7 +399,7 @@ def add_clmn_to_table(db, table, column, col_type, **kwargs):
     else:
         return db.t[table].add_column(column, col_type, **kwargs)
 
-# %% ../nbs/00_create_db_structure.ipynb 22
+# %% ../nbs/00_create_db_structure.ipynb 33
 def drop_clmn_from_table(db, table, column):
     """Drop a column from an existing table"""
     if column not in db.t[table].c:
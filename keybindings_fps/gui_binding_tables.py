@@ -3,49 +3,124 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/04_gui_binding_tables.ipynb.
 
 # %% auto 0
-__all__ = ['get_modifier_name', 'get_key_name', 'get_action_name', 'create_binding_table_category', 'create_bindings_table',
-           'create_bindings_table_print', 'create_actions_table']
+__all__ = ['binding_tables_cache', 'options_cache', 'code_version', 'get_modifier_name', 'get_key_name', 'get_action_name',
+           'get_game_bindings', 'get_binding', 'binding_row', 'create_binding_table_category', 'FragmentCache',
+           'cached_fragment', 'create_bindings_table', 'create_bindings_table_print', 'create_binding_row',
+           'binding_editor_row', 'category_tables_oob', 'binding_messages', 'create_actions_table',
+           'get_game_conflicts', 'create_conflicts_table', 'conflict_warning', 'search_query', 'search_bindings',
+           'search_results', 'select_options', 'get_default_bindings', 'page_headers', 'not_modified', 'http_headers',
+           'revalidate']
 
 # %% ../nbs/04_gui_binding_tables.ipynb 3
+import hashlib, re, threading
+from email.utils import formatdate, parsedate_to_datetime
+from html import escape
+from collections import OrderedDict
+from urllib.parse import quote
 from fasthtml.common import *
 from monsterui.all import *
 from fastcore.test import *
 
+import keybindings_fps
+from . import __version__
+from .manipulate_db_contents import game_revision, stored_revision, conflict_index, catalog
+
 # %% ../nbs/04_gui_binding_tables.ipynb 4
 def get_modifier_name(db, modifier_id):
     """Safely get the modifier name, returning 'None' if not found"""
-    try:
-        return next(db.t.modifiers.rows_where("id = ?", [modifier_id]))['name']
-    except StopIteration:
-        return 'None'
+    modifier = catalog.row(db, 'modifiers', modifier_id)
+    return modifier['name'] if modifier else 'None'
 
 # %% ../nbs/04_gui_binding_tables.ipynb 5
 def get_key_name(db, key_id):
     """Safely get the key name, returning 'Please select  key' if not found"""
-    try:
-        return next(db.t.game_keys.rows_where("id = ?", [key_id]))['name']
-    except StopIteration:
-        return 'Please select a key'
+    key = catalog.row(db, 'game_keys', key_id)
+    return key['name'] if key else 'Please select a key'
 
 # %% ../nbs/04_gui_binding_tables.ipynb 6
 def get_action_name(db, action_id):
     """Safely get the action name, returning 'Unknow action' if not fouund"""
-    try:
-        return next(db.t.actions.rows_where("id = ?", [action_id]))['name']
-    except StopIteration:
-        return 'Unknown action'
+    action = catalog.row(db, 'actions', action_id)
+    return action['name'] if action else 'Unknown action'
 
 # %% ../nbs/04_gui_binding_tables.ipynb 7
-def create_binding_table_category(db, game_id, action_category_id, print_layout=False):
+# The columns of a binding row of the tables, with the names of its action, key and modifier
+_binding_columns = """b.id, b.action_id, a.name AS action_name,
+               b.key_id, COALESCE(k.name, 'Please select a key') AS key_name,
+               b.modifier_id, COALESCE(m.name, 'None') AS modifier_name,
+               b.description, b.sort_order"""
+
+def get_game_bindings(db, game_id, category_id=None):
+    """Get all bindings of a game with their names resolved, grouped by category and ordered by sort_order"""
+    # Every category that has actions is included, also when the game has no bindings for it yet
+    sql = f"""
+        SELECT c.id AS category_id, c.name AS category_name, {_binding_columns}
+        FROM categories c
+        JOIN actions a ON a.category_id = c.id
+        LEFT JOIN bindings b ON b.action_id = a.id AND b.game_id = ?
+        LEFT JOIN game_keys k ON k.id = b.key_id
+        LEFT JOIN modifiers m ON m.id = b.modifier_id"""
+    params = [game_id]
+    if category_id is not None:
+        sql += "\n        WHERE c.id = ?"
+        params.append(category_id)
+    sql += "\n        ORDER BY c.id, b.sort_order, b.id"
+
+    categories = {}
+    for row in db.q(sql, params):
+        cat = categories.setdefault(row['category_id'], dict(id=row['category_id'], name=row['category_name'], bindings=[]))
+        if row['id'] is not None:
+            cat['bindings'].append(row)
+    return categories
+
+def get_binding(db, binding_id):
+    """One binding with its names resolved, like the bindings of `get_game_bindings`, or None when it doesn't exist"""
+    return next(iter(db.q(f"""
+        SELECT b.game_id, a.category_id, {_binding_columns}
+        FROM bindings b
+        JOIN actions a ON a.id = b.action_id
+        LEFT JOIN game_keys k ON k.id = b.key_id
+        LEFT JOIN modifiers m ON m.id = b.modifier_id
+        WHERE b.id = ?""", [binding_id])), None)
+
+# %% ../nbs/04_gui_binding_tables.ipynb 8
+def binding_row(b):
+    """The table row of a binding `b` from `get_game_bindings` or `get_binding`, with its edit and delete buttons"""
+    text_style = TextT.justify
+    return Tr(
+        Td("⋮⋮", style="width: 10px;"),
+        Td(b['action_name'],
+            cls=text_style),
+        Td(b['key_name'],
+            cls=text_style),
+        Td(b['modifier_name'],
+            cls=text_style),
+        Td(b['description'],
+            cls=text_style),
+        # Editing swaps the row for the edit screen, deleting removes the row
+        Td(Button("Edit", 
+                hx_get=f"/binding/{b['id']}/edit",
+                hx_target=f"#binding-{b['id']}",
+                hx_swap="outerHTML",
+                cls=ButtonT.secondary),
+            Button("Delete", 
+                hx_delete=f"/binding/{b['id']}/delete",
+                hx_target=f"#binding-{b['id']}",
+                hx_swap="delete",
+                cls=ButtonT.destructive),
+            cls="space-x-2"),
+        Hidden(name="binding_id", value=b['id']),
+        id=f"binding-{b['id']}"
+        )
+
+def create_binding_table_category(db, game_id, action_category_id, print_layout=False, category=None):
+    """Helper function to create the bindings table for a given action category.
+    `category` is an entry from `get_game_bindings`; it is fetched when not given."""
     print("Creating binding table for category", action_category_id)
     print("Game ID:", game_id)
 
-    """Helper function to create the bindings table for a given action category"""
-    # Get all categories and create lookup dicts
-    cat_actions = db.t.actions.rows_where("category_id = ?", [action_category_id])
-    action_ids = L(cat_actions).attrgot("id")
-
-    cat_name = L(db.t.categories.rows_where("id = ?", [action_category_id])).attrgot('name')[0]
+    if category is None:
+        category = get_game_bindings(db, game_id, action_category_id)[action_category_id]
 
     # Create table with category groups
     table_heading = Tr(
@@ -66,47 +141,21 @@ def create_binding_table_category(db, game_id, action_category_id, print_layout=
     text_style = TextT.justify
 
     rows = []
-       
-    # Add bindings for this category
-    action_ids_str = ','.join(str(id) for id in action_ids) 
-    # Convert action_ids to string. Converting to a tuple creates a trailing comma with only one element. Which gives invalid SQL syntax.
-    where_string = f"game_id = {game_id} AND action_id IN ({action_ids_str}) ORDER BY sort_order"
 
     def non_tap_modifier(modifier):
         if modifier != "tap":
             return f"   ({modifier})"
         return ""
 
-    for b in db.t.bindings.rows_where(where_string):
+    for b in category['bindings']:
         if not print_layout:
-            rows.append(Tr(
-                Td("⋮⋮", style="width: 10px;"),
-                Td(get_action_name(db, b['action_id']),
-                    cls=text_style),
-                Td(get_key_name(db, b['key_id']),
-                    cls=text_style),
-                Td(get_modifier_name(db, b['modifier_id']),
-                    cls=text_style),
-                Td(b['description'],
-                    cls=text_style),
-                Td(Button("Edit", 
-                        hx_get=f"/binding/{b['id']}/edit",
-                        hx_target="#bindings-table",
-                        cls=ButtonT.secondary),
-                    Button("Delete", 
-                        hx_delete=f"/binding/{b['id']}/delete",
-                        hx_target=f"#form-category-{action_category_id}",
-                        cls=ButtonT.destructive),
-                    cls="space-x-2"),
-                Hidden(name="binding_id", value=b['id']),
-                )
-            )
+            rows.append(binding_row(b))
         if print_layout:
             rows.append(Tr(
-                Td(get_action_name(db, b['action_id']),
+                Td(b['action_name'],
                     cls=text_style),
-                Td(get_key_name(db, b['key_id']),
-                P(non_tap_modifier(get_modifier_name(db, b['modifier_id'])), cls=TextT.italic),
+                Td(b['key_name'],
+                P(non_tap_modifier(b['modifier_name']), cls=TextT.italic),
                 cls=text_style),
                 Td(b['description'], cls=TextT.muted),
                 Hidden(name="binding_id", value=b['id']),
@@ -114,7 +163,7 @@ def create_binding_table_category(db, game_id, action_category_id, print_layout=
             )
     
     return Div(
-        P(cat_name, cls=(TextT.lg, TextT.bold, TextT.primary, TextT.center)),
+        P(category['name'], cls=(TextT.lg, TextT.bold, TextT.primary, TextT.center)),
         Form(
             Table(Thead(table_heading),
                   Tbody(*rows,
@@ -124,42 +173,280 @@ def create_binding_table_category(db, game_id, action_category_id, print_layout=
             ),
             hx_post=f"/game/{game_id}/reorder_bindings/{action_category_id}",
             hx_trigger="end from:tbody",
-            hx_target=f"#form-category-{action_category_id}",
+            # The category comes back out of band, see `category_tables_oob`
+            hx_swap="none",
         ),
         id=f"form-category-{action_category_id}"
     )
 
-# %% ../nbs/04_gui_binding_tables.ipynb 8
+# %% ../nbs/04_gui_binding_tables.ipynb 9
+class FragmentCache:
+    """LRU cache for rendered html fragments, bounded by the total size of the cached html"""
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes, self.size, self.hits, self.misses = max_bytes, 0, 0, 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        """Get the html cached for `key`, if it was rendered from data with this `version`"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, html: str):
+        """Cache `html` for `key`, replacing older versions and evicting the least recently used entries"""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None: self.size -= len(old[1])
+            if len(html) > self.max_bytes: return
+            self._entries[key] = (version, html)
+            self.size += len(html)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return dict(hits=self.hits, misses=self.misses, entries=len(self._entries), size=self.size, max_bytes=self.max_bytes)
+
+binding_tables_cache = FragmentCache()
+
+# %% ../nbs/04_gui_binding_tables.ipynb 10
+def cached_fragment(db, game_id, layout, render):
+    """Return the html of `render()` from `binding_tables_cache`, rendering it again only after the game's data changed"""
+    key, version = (db.conn.filename, game_id, layout), game_revision(db, game_id)
+    html = binding_tables_cache.get(key, version)
+    if html is None:
+        html = to_xml(render())
+        binding_tables_cache.put(key, version, html)
+    return NotStr(html)
+
+# %% ../nbs/04_gui_binding_tables.ipynb 11
 def create_bindings_table(db, game_id):
     """Create tables for all action categories and stack them vertically"""
-    # Get all unique category IDs
-    categories = db.t.categories.rows_where("id IN (SELECT DISTINCT category_id FROM actions)")
-    category_ids = L(categories).attrgot('id')
-    
-    # Create a table for each category
-    tables = [create_binding_table_category(db, game_id, cat_id) for cat_id in category_ids]
-    
-    # Stack tables in a container div
-    return Div(*tables, id="all-bindings-tables")
+    def render():
+        # Get all bindings of the game in one query, grouped by category
+        categories = get_game_bindings(db, game_id)
+        
+        # Create a table for each category
+        tables = [create_binding_table_category(db, game_id, cat_id, category=cat) for cat_id, cat in categories.items()]
+        
+        # Stack tables in a container div
+        return Div(*tables, id="all-bindings-tables")
 
+    return cached_fragment(db, game_id, 'edit', render)
 
-# %% ../nbs/04_gui_binding_tables.ipynb 9
+# %% ../nbs/04_gui_binding_tables.ipynb 12
 def create_bindings_table_print(db, game_id):
+    def render():
+        categories = get_game_bindings(db, game_id)
 
-    categories = db.t.categories.rows_where("id IN (SELECT DISTINCT category_id FROM actions)")
-    category_ids = L(categories).attrgot('id')
+        tables = [create_binding_table_category(db, game_id, cat_id, print_layout=True, category=cat) for cat_id, cat in categories.items()]
 
-    tables = [create_binding_table_category(db, game_id, cat_id, print_layout=True) for cat_id in category_ids]
+        return Card(Grid(
+            Card(tables[0]),
+            Card(tables[1]),
+            Card(*tables[2:]),
+            cols=3, cls='gap-12'))
 
-    return Card(Grid(
-        Card(tables[0]),
-        Card(tables[1]),
-        Card(*tables[2:]),
-        cols=3, cls='gap-12'))
+    return cached_fragment(db, game_id, 'print', render)
 
-# %% ../nbs/04_gui_binding_tables.ipynb 10
+# %% ../nbs/04_gui_binding_tables.ipynb 14
+def create_binding_row(db, binding_id):
+    """The table row of one binding, to put back on the page after it was edited"""
+    return binding_row(get_binding(db, binding_id))
+
+def binding_editor_row(binding_id, editor):
+    """A table row with the edit screen of a binding, swapped in over the row of the binding"""
+    return Tr(Td(editor, colspan="6"), Hidden(name="binding_id", value=binding_id), id=f"binding-{binding_id}")
+
+def category_tables_oob(db, game_id, category_ids) -> tuple:
+    """The tables of the given categories of a game, swapped in out of band over the tables on the page"""
+    if not category_ids: return ()
+    # A single category is the common case, it doesn't need the bindings of the whole game
+    categories = get_game_bindings(db, game_id, category_ids[0] if len(category_ids) == 1 else None)
+    return tuple(create_binding_table_category(db, game_id, c, category=categories[c])(hx_swap_oob="true")
+                 for c in category_ids if c in categories)
+
+def binding_messages(*content):
+    """The message area above the tables of a game, swapped in out of band to show or clear a warning"""
+    return Div(*content, id="binding-messages", hx_swap_oob="true")
+
+# %% ../nbs/04_gui_binding_tables.ipynb 15
 def create_actions_table(db):
     """Create a table for all actions"""
     headers = db.t.actions()[0].keys()
     rows = db.t.actions()
     return TableFromDicts(headers, rows, id="actions-table")
+
+# %% ../nbs/04_gui_binding_tables.ipynb 16
+def get_game_conflicts(db, game_id):
+    """Per key and modifier that is bound to more than one action of the game, the names of those actions"""
+    conflicts = conflict_index.conflicts(db, game_id)
+    binding_ids = [b for bindings in conflicts.values() for b in bindings]
+    if not binding_ids: return []
+    rows = db.q(f"""
+        SELECT b.id, a.name AS action_name, k.name AS key_name, m.name AS modifier_name
+        FROM bindings b
+        JOIN actions a ON a.id = b.action_id
+        LEFT JOIN game_keys k ON k.id = b.key_id
+        LEFT JOIN modifiers m ON m.id = b.modifier_id
+        WHERE b.id IN ({','.join('?' * len(binding_ids))})""", binding_ids)
+    names = {r['id']: r for r in rows}
+    result = []
+    for bindings in conflicts.values():
+        rows = [names[b] for b in bindings if b in names]
+        if rows: result.append(dict(key_name=rows[0]['key_name'], modifier_name=rows[0]['modifier_name'],
+                                    actions=[r['action_name'] for r in rows]))
+    return sorted(result, key=lambda c: (c['key_name'] or '', c['modifier_name'] or ''))
+
+def create_conflicts_table(db, game_id):
+    """Table of the keys and modifiers that are bound to more than one action"""
+    conflicts = get_game_conflicts(db, game_id)
+    if not conflicts: return P("No key is bound to more than one action.", id="conflicts-table")
+    return Table(
+        Thead(Tr(Th("Key"), Th("Modifier"), Th("Actions"))),
+        Tbody(*[Tr(Td(c['key_name']), Td(c['modifier_name']), Td(', '.join(c['actions']))) for c in conflicts]),
+        id="conflicts-table")
+
+def conflict_warning(game_id, clashes):
+    """Warning shown after a write that bound a key and modifier that other actions already use"""
+    if not clashes: return None
+    return Div(f"This key and modifier are also bound to {len(clashes)} other binding(s) of this game. ",
+               A("Show conflicts", href=f"/game/{game_id}/conflicts"), cls=AlertT.warning)
+
+# %% ../nbs/04_gui_binding_tables.ipynb 18
+def search_query(text: str) -> str:
+    """An FTS5 query for the bindings that contain every word of `text`, as a word or the start of one"""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+def search_bindings(db, text: str, limit: int = 20, offset: int = 0) -> list:
+    """The bindings that match `text`, best matches first, with the matches in their names and description marked"""
+    query = search_query(text)
+    if not query: return []
+    return db.q("""
+        SELECT s.rowid AS id, b.game_id,
+               highlight(bindings_search, 0, char(2), char(3)) AS game,
+               highlight(bindings_search, 1, char(2), char(3)) AS action,
+               highlight(bindings_search, 2, char(2), char(3)) AS category,
+               snippet(bindings_search, 3, char(2), char(3), '…', 12) AS description,
+               k.name AS key_name, m.name AS modifier_name
+        FROM bindings_search s
+        JOIN bindings b ON b.id = s.rowid
+        LEFT JOIN game_keys k ON k.id = b.key_id
+        LEFT JOIN modifiers m ON m.id = b.modifier_id
+        WHERE bindings_search MATCH ?
+        ORDER BY s.rank LIMIT ? OFFSET ?""", [query, limit, offset])
+
+def _marked(text):
+    """Html of text from `search_bindings`, with its matches in `<mark>`s"""
+    return NotStr(escape(text or '').replace('\x02', '<mark>').replace('\x03', '</mark>'))
+
+def search_results(db, text: str, page: int = 1, per_page: int = 20):
+    """Table rows of one page of search results, followed by a button that loads the next page when it scrolls into view"""
+    page = max(page, 1)
+    hits = search_bindings(db, text, per_page + 1, (page - 1) * per_page)
+    if not hits and page == 1:
+        return Tr(Td("No bindings match your search." if text.strip() else "", colspan="5", cls=TextT.muted)),
+    rows = [Tr(Td(A(_marked(h['game']), href=f"/game/{h['game_id']}")),
+               Td(_marked(h['action'])),
+               Td(_marked(h['category'])),
+               Td(f"{h['key_name'] or '?'} ({h['modifier_name'] or 'None'})"),
+               Td(_marked(h['description']), cls=TextT.muted))
+            for h in hits[:per_page]]
+    if len(hits) > per_page:
+        rows.append(Tr(Td(Button("Load more results",
+                                 hx_get=f"/search?q={quote(text)}&page={page + 1}",
+                                 hx_trigger="click, revealed",
+                                 hx_target="closest tr",
+                                 hx_swap="outerHTML",
+                                 cls=ButtonT.secondary),
+                          colspan="5")))
+    return tuple(rows)
+
+# %% ../nbs/04_gui_binding_tables.ipynb 21
+options_cache = FragmentCache(max_bytes=1024 * 1024)
+
+def select_options(db, table, selected=None, value='id', label='name'):
+    """The `<option>`s for all rows of a lookup table, with the option whose value is `selected` selected"""
+    key, version = (db.conn.filename, table, value, label), game_revision(db, None)
+    options = options_cache.get(key, version)
+    if options is None:
+        options = ''.join(f'<option value="{escape(str(row[value]))}">{escape(str(row[label]))}</option>'
+                          for row in catalog.rows(db, table))
+        options_cache.put(key, version, options)
+    if selected is not None:
+        option = f'<option value="{escape(str(selected))}">'
+        options = options.replace(option, f'{option[:-1]} selected>', 1)
+    return NotStr(options)
+
+# %% ../nbs/04_gui_binding_tables.ipynb 22
+_default_bindings = {}
+_default_bindings_lock = threading.Lock()
+
+def get_default_bindings(db) -> dict:
+    """Map of action id to the key and modifier id of its first binding in the default game"""
+    cached = _default_bindings.get(db.conn.filename)
+    if cached and cached['version'] == game_revision(db, cached['game_id']): return cached['bindings']
+
+    default = db.q("SELECT id FROM games WHERE name = ? ORDER BY id LIMIT 1", ['default'])
+    if not default: return {}
+    game_id = default[0]['id']
+    version = game_revision(db, game_id)
+    # The first binding in sort order is written last
+    bindings = {b['action_id']: (b['key_id'], b['modifier_id']) for b in db.q(
+        "SELECT action_id, key_id, modifier_id FROM bindings WHERE game_id = ? ORDER BY sort_order DESC, id DESC", [game_id])}
+    with _default_bindings_lock:
+        _default_bindings[db.conn.filename] = dict(game_id=game_id, version=version, bindings=bindings)
+    return bindings
+
+# %% ../nbs/04_gui_binding_tables.ipynb 24
+def _code_fingerprint() -> str:
+    package = Path(keybindings_fps.__file__).resolve().parent
+    # The apps are next to the package in a checkout, an installed package has only its own modules
+    sources = sorted(package.glob('*.py')) + [package.parent/'main.py', package.parent/'gui'/'app.py']
+    h = hashlib.sha256()
+    for path in sources:
+        if path.exists(): h.update(path.name.encode() + path.read_bytes())
+    return h.hexdigest()[:12]
+
+# The version with a hash of the code that renders the pages, nobody bumps `__version__` for a change to the markup
+code_version = f"{__version__}+{_code_fingerprint()}"
+
+def page_headers(db, game_id: int, req) -> dict:
+    """`ETag`, `Last-Modified` and `Cache-Control` headers of a page that shows the data of a game"""
+    (shared, game), modified = stored_revision(db, game_id)
+    variant = 'fragment' if req.headers.get('hx-request') else 'page'
+    # Only what every server process agrees on goes into the tag, `modified` starts at the start of the process
+    return {'ETag': f'"{code_version}-{game_id}-{shared}-{game}-{variant}"',
+            'Last-Modified': formatdate(modified, usegmt=True),
+            # Caches may keep the page, but have to check with the server before they use it
+            'Cache-Control': 'no-cache'}
+
+def not_modified(req, headers: dict) -> bool:
+    """Whether the request already has the version of the page described by `headers`"""
+    if_none_match = req.headers.get('if-none-match')
+    if if_none_match is not None:
+        return if_none_match.strip() == '*' or headers['ETag'] in [t.strip().removeprefix('W/') for t in if_none_match.split(',')]
+    if_modified_since = req.headers.get('if-modified-since')
+    if not if_modified_since or 'Last-Modified' not in headers: return False
+    try: return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(headers['Last-Modified'])
+    except (TypeError, ValueError): return False
+
+def http_headers(headers: dict) -> tuple:
+    """The headers as `HttpHeader`s, to return them from a route together with the page"""
+    return tuple(HttpHeader(k, v) for k, v in headers.items())
+
+async def revalidate(data, game_id: int, req) -> tuple:
+    """The headers of a page of the game, and a `304 Not Modified` response when the request already has this version or else None"""
+    headers = await data.read(page_headers, game_id, req)
+    return headers, Response(status_code=304, headers=headers) if not_modified(req, headers) else None
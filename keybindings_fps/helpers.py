@@ -3,12 +3,14 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/03_helpers.ipynb.
 
 # %% auto 0
-__all__ = ['get_project_root', 'nav', 'base_layout', 'ex_theme_switcher']
+__all__ = ['get_project_root', 'image_mime_type', 'nav', 'base_layout', 'get_games_page', 'game_card', 'games_grid_page',
+           'ex_theme_switcher']
 
 # %% ../nbs/03_helpers.ipynb 3
 from fasthtml.common import *
 from monsterui.all import *
 from fastcore.test import *
+from urllib.parse import quote
 
 # %% ../nbs/03_helpers.ipynb 5
 def get_project_root() -> Optional[Path]:
@@ -29,23 +31,84 @@ def get_project_root() -> Optional[Path]:
         print(f"Error finding project root: {str(e)}")
         return None
 
-# %% ../nbs/03_helpers.ipynb 7
+# %% ../nbs/03_helpers.ipynb 6
+def image_mime_type(image: bytes) -> str:
+    """Guess the content type of an image from its first bytes, defaulting to jpeg"""
+    signatures = {
+        b'\x89PNG\r\n\x1a\n': 'image/png',
+        b'GIF87a': 'image/gif',
+        b'GIF89a': 'image/gif',
+        b'\xff\xd8\xff': 'image/jpeg',
+    }
+    for signature, mime_type in signatures.items():
+        if image.startswith(signature):
+            return mime_type
+    if image[:4] == b'RIFF' and image[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'image/jpeg'
+
+# %% ../nbs/03_helpers.ipynb 9
 def nav():
     """Create a navigation bar"""
     nav = NavBar(
         A("Add Game", href="/add_game"),
         A("Add new action", href="/add_action"),
         A("Edit actions", href="/edit_actions"),
+        A("Search", href="/search"),
         A("Settings", href="/settings"),
         brand=A("Games", href="/")
         )
     return nav
 
-# %% ../nbs/03_helpers.ipynb 8
+# %% ../nbs/03_helpers.ipynb 10
 def base_layout(content):
     """Base layout with navigation bar"""
     return Container(nav(), Div(content, id="content-area"), id="base-layout")
 
-# %% ../nbs/03_helpers.ipynb 9
+# %% ../nbs/03_helpers.ipynb 11
+def get_games_page(db, # Database connection
+                   after: str = None, # Name of the last game on the previous page
+                   limit: int = 24 # Number of games on a page
+                   ):
+    """Get a page of games ordered by name, without the default template and without loading the images"""
+    where, params = "name != ?", ["default"]
+    if after is not None:
+        where += " AND name > ?"
+        params.append(after)
+    return db.q(f"""SELECT id, name, game_type, image IS NOT NULL AS has_image
+                    FROM games WHERE {where} ORDER BY name LIMIT ?""", params + [limit])
+
+# %% ../nbs/03_helpers.ipynb 12
+def game_card(game):
+    """Clickable card for the games grid, the image is served by /game/{game_id}/image"""
+    if game['has_image']:
+        image = Img(src=f"/game/{game['id']}/image", loading="lazy",
+                    cls=(TextT.muted, TextT.italic, BackgroundT.muted))
+    else:
+        image = Div("No image", cls=(TextT.muted, TextT.italic, BackgroundT.muted))
+
+    return A(Card(
+        CardHeader(H3(game['name']), cls="text-primary"),
+        CardBody(
+            image,
+            P(f"Type: {game['game_type']}", cls=(TextT.muted))
+        ),
+        cls=CardT.hover  # Makes whole card clickable
+    ), href=f"/game/{game['id']}")
+
+# %% ../nbs/03_helpers.ipynb 13
+def games_grid_page(db, after: str = None, limit: int = 24):
+    """Cards for one page of games, followed by a button that loads the next page when it scrolls into view"""
+    games = get_games_page(db, after, limit + 1)
+    cards = [game_card(game) for game in games[:limit]]
+    if len(games) > limit:
+        cards.append(Button("Load more games",
+                            hx_get=f"/games?after={quote(games[limit - 1]['name'])}",
+                            hx_trigger="click, revealed",
+                            hx_swap="outerHTML",
+                            cls=ButtonT.secondary))
+    return tuple(cards)
+
+# %% ../nbs/03_helpers.ipynb 15
 def ex_theme_switcher():
     return ThemePicker()
@@ -0,0 +1,211 @@
+"""Stream the bindings of games to and from JSONL or CSV files, by name instead of id, to move them between instances."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/08_import_export.ipynb.
+
+# %% auto 0
+__all__ = ['binding_fields', 'iter_bindings', 'export_lines', 'export_bindings', 'read_bindings', 'NameResolver',
+           'import_bindings', 'import_file', 'export_cli', 'import_cli']
+
+# %% ../nbs/08_import_export.ipynb 3
+import io, csv, json
+from pathlib import Path
+from fastcore.basics import chunked
+from fastcore.script import call_parse, store_true
+from fastcore.test import *
+from fasthtml.common import *
+
+from .create_db_structure import *
+from .manipulate_db_contents import *
+
+# %% ../nbs/08_import_export.ipynb 5
+binding_fields = ['game', 'game_type', 'category', 'action', 'key', 'modifier', 'description', 'sort_order']
+
+def iter_bindings(db: database, # Database connection
+                  games: list = None # Names of the games to export, all games when None
+                  ):
+    """The bindings of the games as dicts of names, one at a time"""
+    if games is None: game_rows = db.q("SELECT id, name, game_type FROM games ORDER BY name")
+    else: game_rows = db.q(f"SELECT id, name, game_type FROM games WHERE name IN ({','.join('?' * len(games))}) ORDER BY name", list(games))
+    for game in game_rows:
+        for row in db.execute("""
+            SELECT c.name, a.name, k.name, m.name, b.description, b.sort_order
+            FROM bindings b
+            JOIN actions a ON a.id = b.action_id
+            LEFT JOIN categories c ON c.id = a.category_id
+            LEFT JOIN game_keys k ON k.id = b.key_id
+            LEFT JOIN modifiers m ON m.id = b.modifier_id
+            WHERE b.game_id = ?
+            ORDER BY b.sort_order, b.id""", [game['id']]):
+            yield dict(zip(binding_fields, (game['name'], game['game_type'], *row)))
+
+def export_lines(db: database, games: list = None,
+                 format: str = 'jsonl' # 'jsonl' or 'csv'
+                 ):
+    """The bindings of the games as lines of JSONL or CSV, a CSV starts with a header"""
+    if format == 'jsonl':
+        for binding in iter_bindings(db, games): yield json.dumps(binding, ensure_ascii=False) + '\n'
+    elif format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, binding_fields, lineterminator='\n')
+        def line(row):
+            writer.writerow(row)
+            value = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return value
+        yield line(dict(zip(binding_fields, binding_fields)))
+        for binding in iter_bindings(db, games): yield line(binding)
+    else: raise ValueError(f"Unknown format '{format}', use 'jsonl' or 'csv'")
+
+def export_bindings(db: database, path: Path, games: list = None,
+                    format: str = None # Defaults to the extension of `path`
+                    ) -> int:
+    """Write the bindings of the games to a JSONL or CSV file and return how many were written"""
+    path = Path(path)
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for line in export_lines(db, games, format or path.suffix.lstrip('.')):
+            f.write(line)
+            count += 1
+    return count - 1 if (format or path.suffix.lstrip('.')) == 'csv' else count
+
+# %% ../nbs/08_import_export.ipynb 7
+def read_bindings(path: Path,
+                  format: str = None # Defaults to the extension of `path`
+                  ):
+    """The bindings of a JSONL or CSV export as dicts, one at a time"""
+    path = Path(path)
+    format = format or path.suffix.lstrip('.')
+    if format not in ('jsonl', 'csv'): raise ValueError(f"Unknown format '{format}', use 'jsonl' or 'csv'")
+    with open(path, newline='', encoding='utf-8') as f:
+        if format == 'jsonl':
+            for line in f:
+                if line.strip(): yield json.loads(line)
+        else:
+            for row in csv.DictReader(f):
+                # CSV has no nulls, empty fields are read as missing values
+                row = {k: v if v != '' else None for k, v in row.items()}
+                if row.get('sort_order') is not None: row['sort_order'] = int(row['sort_order'])
+                yield row
+
+# %% ../nbs/08_import_export.ipynb 8
+class NameResolver:
+    """Ids of names in the lookup tables, queried in batches and remembered. With duplicate names the first row wins."""
+    def __init__(self, db):
+        self.db, self.ids = db, {t: {} for t in ['games', 'categories', 'game_keys', 'modifiers', 'actions']}
+
+    def _query(self, sql, names):
+        names = list(names)
+        return self.db.q(sql.format(','.join('?' * len(names))), names) if names else []
+
+    def resolve(self, table: str, names):
+        """Look up the names that are not known yet"""
+        ids = self.ids[table]
+        missing = {n for n in names if n is not None and n not in ids}
+        for row in self._query(f"SELECT id, name FROM {table} WHERE name IN ({{}}) ORDER BY id DESC", missing):
+            ids[row['name']] = row['id']
+
+    def resolve_actions(self, pairs):
+        """Look up the (category, action) names that are not known yet"""
+        ids = self.ids['actions']
+        missing = {action for category, action in pairs if action is not None and (category, action) not in ids}
+        for row in self._query("""SELECT a.id, a.name, c.name AS category FROM actions a LEFT JOIN categories c ON c.id = a.category_id
+                                  WHERE a.name IN ({}) ORDER BY a.id DESC""", missing):
+            ids[row['category'], row['name']] = row['id']
+            ids[None, row['name']] = row['id'] # For rows without a category
+
+# %% ../nbs/08_import_export.ipynb 9
+def import_bindings(db: database,
+                    rows, # Dicts with the fields of `binding_fields`, like the ones of `read_bindings`
+                    batch_size: int = 1000, # Rows per name lookup and per transaction
+                    replace: bool = False, # Remove the existing bindings of every imported game first
+                    dry_run: bool = False, # Validate and count without writing anything
+                    progress = None # Called with the statistics after every batch
+                    ) -> dict:
+    """Import bindings by name in batches. Returns the number of rows, imported and skipped rows, created games and actions, and the first errors."""
+    stats = dict(rows=0, imported=0, skipped=0, games_created=0, actions_created=0, errors=[])
+    names = NameResolver(db)
+    replaced, dry_run_ids = set(), iter(range(-1, -2**62, -1)) # Placeholder ids for what a dry run would create
+
+    def skip(row_number, message):
+        stats['skipped'] += 1
+        if len(stats['errors']) < 100: stats['errors'].append((row_number, message))
+
+    def create(table, **values):
+        return next(dry_run_ids) if dry_run else db.t[table].insert(values)['id']
+
+    for batch in chunked(rows, batch_size):
+        for table, field in [('games', 'game'), ('categories', 'category'), ('game_keys', 'key'), ('modifiers', 'modifier')]:
+            names.resolve(table, (row.get(field) for row in batch))
+        names.resolve_actions((row.get('category'), row.get('action')) for row in batch)
+
+        bindings, touched = [], set()
+        with db.conn:
+            for row in batch:
+                stats['rows'] += 1
+                key_id, modifier_id = names.ids['game_keys'].get(row.get('key')), names.ids['modifiers'].get(row.get('modifier'))
+                if not row.get('game') or not row.get('action'):
+                    skip(stats['rows'], "A game and an action are required"); continue
+                if key_id is None: skip(stats['rows'], f"Key '{row.get('key')}' not found"); continue
+                if modifier_id is None: skip(stats['rows'], f"Modifier '{row.get('modifier')}' not found"); continue
+
+                action_key = (row.get('category'), row['action'])
+                action_id = names.ids['actions'].get(action_key)
+                if action_id is None:
+                    category_id = names.ids['categories'].get(row.get('category'))
+                    if category_id is None:
+                        skip(stats['rows'], f"Action '{row['action']}' and category '{row.get('category')}' not found"); continue
+                    action_id = names.ids['actions'][action_key] = create('actions', name=row['action'], category_id=category_id)
+                    stats['actions_created'] += 1
+
+                game_id = names.ids['games'].get(row['game'])
+                if game_id is None:
+                    game_id = names.ids['games'][row['game']] = create('games', name=row['game'], game_type=row.get('game_type'))
+                    stats['games_created'] += 1
+                if replace and game_id not in replaced:
+                    replaced.add(game_id)
+                    if not dry_run: db.execute("DELETE FROM bindings WHERE game_id = ?", [game_id])
+
+                touched.add(game_id)
+                bindings.append(dict(game_id=game_id, action_id=action_id, key_id=key_id, modifier_id=modifier_id,
+                                     description=row.get('description'), sort_order=row.get('sort_order') or 0))
+            if not dry_run and bindings: db.t.bindings.insert_all(bindings)
+        stats['imported'] += len(bindings)
+
+        if not dry_run:
+            if stats['actions_created']: bump_revision(db)
+            for game_id in touched: bump_revision(db, game_id)
+        if progress: progress(stats)
+    return stats
+
+# %% ../nbs/08_import_export.ipynb 10
+def import_file(db: database, path: Path, format: str = None, **kwargs) -> dict:
+    """Import the bindings of a JSONL or CSV export, see `import_bindings` for the options"""
+    return import_bindings(db, read_bindings(path, format), **kwargs)
+
+# %% ../nbs/08_import_export.ipynb 15
+@call_parse
+def export_cli(path: str, # JSONL or CSV file to write
+               games: str = None, # Comma separated names of the games, all games when empty
+               data_dir: str = None # Directory of the database, the data directory of the project when empty
+               ):
+    "Export the bindings of games to a JSONL or CSV file"
+    db = init_db(Path(data_dir) if data_dir else None)
+    count = export_bindings(db, path, games.split(',') if games else None)
+    print(f"Exported {count} bindings to {path}")
+
+@call_parse
+def import_cli(path: str, # JSONL or CSV file to read
+               data_dir: str = None, # Directory of the database, the data directory of the project when empty
+               batch_size: int = 1000, # Rows per transaction
+               replace: store_true = False, # Remove the existing bindings of every imported game first
+               dry_run: store_true = False # Validate the file without writing anything
+               ):
+    "Import the bindings of a JSONL or CSV file"
+    db = init_db(Path(data_dir) if data_dir else None)
+    stats = import_file(db, path, batch_size=batch_size, replace=replace, dry_run=dry_run,
+                        progress=lambda s: print(f"{s['rows']} rows, {s['imported']} imported, {s['skipped']} skipped", end='\r'))
+    print()
+    for row_number, message in stats['errors'][:10]: print(f"Row {row_number}: {message}")
+    if stats['skipped'] > 10: print(f"... and {stats['skipped'] - 10} more skipped rows")
+    print(f"{'Would import' if dry_run else 'Imported'} {stats['imported']} bindings, created {stats['games_created']} games and {stats['actions_created']} actions")
@@ -3,73 +3,390 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/01_manipulate_db_contents.ipynb.
 
 # %% auto 0
-__all__ = ['add_binding', 'upsert_game', 'delete_game', 'add_new_action', 'copy_default_bindings', 'compare_with_default']
+__all__ = ['conflict_index', 'catalog', 'image_max_bytes', 'image_timeout', 'image_limits', 'game_revision', 'bump_revision',
+           'deferred_revisions', 'stored_revision', 'ConflictIndex', 'Catalog', 'add_binding', 'insert_binding',
+           'update_binding', 'delete_binding', 'image_client', 'close_image_client', 'fetch_image', 'download_image',
+           'upsert_game', 'store_game_image', 'game_image_digest', 'update_game_image', 'delete_game',
+           'reorder_bindings', 'WriteQueue', 'add_new_action', 'clone_bindings', 'copy_default_bindings',
+           'reset_game_bindings', 'compare_with_default', 'compare_all_with_default']
 
 # %% ../nbs/01_manipulate_db_contents.ipynb 3
+import apsw, asyncio, contextvars, json, queue, threading, time, weakref
+from concurrent.futures import Future
+from contextlib import contextmanager
 from pathlib import Path
-from httpx import get as httpx_get
+from tempfile import SpooledTemporaryFile
+import httpx
+from fastcore.test import *
 from fasthtml.common import *
 
 from .create_db_structure import *
 
 # %% ../nbs/01_manipulate_db_contents.ipynb 4
+_revisions = {}
+_stamps = {} # The revisions in the database that the in-memory revisions are up to date with
+_revisions_lock = threading.Lock()
+_deferred = threading.local()
+_started = time.time()
+
+def _bump(key, stamp=None):
+    with _revisions_lock:
+        _revisions[key] = _revisions.get(key, 0) + 1
+        if stamp is not None: _stamps[key] = stamp
+
+def _sync_revisions(db, game_id: int) -> dict:
+    """Read the stored revisions of the shared tables and the game, and bump the in-memory ones that another process moved on"""
+    rows = {r[0]: r[1:] for r in db.execute("SELECT game_id, revision, modified FROM revisions WHERE game_id IN (0, ?)", [game_id or 0])}
+    for scope, key in [(0, (db.conn.filename, None)), (game_id or 0, (db.conn.filename, game_id))]:
+        revision = rows.get(scope, (0,))[0]
+        if _stamps.get(key, 0) != revision: _bump(key, revision)
+    return rows
+
+def game_revision(db, game_id: int) -> int:
+    """Revision of the data shown for a game, it increases with every write to the game or to the shared tables"""
+    # Inside a transaction the writer holds its own bumps back until the commit, only check the stored ones outside of it
+    if db.conn.getautocommit():
+        try: _sync_revisions(db, game_id)
+        except apsw.SQLError: pass # A database without the revisions table
+    filename = db.conn.filename
+    return _revisions.get((filename, None), 0) + _revisions.get((filename, game_id), 0)
+
+def _store_revision(db, game_id):
+    try:
+        return db.execute("""INSERT INTO revisions (game_id, revision, modified) VALUES (?, 1, ?)
+                             ON CONFLICT (game_id) DO UPDATE SET revision = revision + 1, modified = excluded.modified
+                             RETURNING revision""", [game_id or 0, time.time()]).fetchone()[0]
+    except apsw.SQLError: return None # A database without the revisions table
+
+def bump_revision(db, game_id: int = None):
+    """Mark the data of a game as changed. Without a `game_id` the shared tables changed, which affects every game."""
+    key = (db.conn.filename, game_id)
+    stamp = _store_revision(db, game_id)
+    deferred = getattr(_deferred, 'keys', None)
+    if deferred is not None: deferred[key] = stamp
+    else: _bump(key, stamp)
+
+def _pending_revision(db, game_id: int) -> int:
+    """`game_revision` with the bumps that this thread holds back in `deferred_revisions`, it is the revision after the commit"""
+    deferred, filename = getattr(_deferred, 'keys', None) or {}, db.conn.filename
+    return game_revision(db, game_id) + ((filename, None) in deferred) + ((filename, game_id) in deferred)
+
+@contextmanager
+def deferred_revisions():
+    """Hold back the revision bumps of this thread until the block ends, so that other threads don't cache data that isn't committed yet"""
+    outer, _deferred.keys = getattr(_deferred, 'keys', None), {}
+    try: yield
+    finally:
+        keys, _deferred.keys = _deferred.keys, outer
+        for key, stamp in keys.items():
+            if outer is not None: outer[key] = stamp
+            else: _bump(key, stamp)
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 6
+def stored_revision(db, game_id: int) -> tuple:
+    """The stored revisions of the shared tables and of the game, and the time of the last change to either of them"""
+    rows = _sync_revisions(db, game_id)
+    revisions, modified = [], _started # Changes made before this process started may not have been stored
+    for scope in [0, game_id]:
+        revision, changed = rows.get(scope, (0, 0.0))
+        revisions.append(revision)
+        modified = max(modified, changed)
+    return tuple(revisions), modified
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 9
+class ConflictIndex:
+    """Bindings per key and modifier for every game, kept up to date by the write paths of the bindings.
+    An index is built with one query when a game is first checked, and rebuilt when the game was changed by another write."""
+    def __init__(self):
+        self._games = {}
+        self._lock = threading.RLock()
+
+    def _build(self, db, game_id):
+        index = dict(revision=game_revision(db, game_id), slots={}, bindings={}, conflicts=set())
+        for b in db.q("SELECT id, action_id, key_id, modifier_id FROM bindings WHERE game_id = ? AND key_id IS NOT NULL", [game_id]):
+            self._add(index, b['id'], b['key_id'], b['modifier_id'], b['action_id'])
+        return index
+
+    def _index(self, db, game_id):
+        key = (db.conn.filename, game_id)
+        index = self._games.get(key)
+        # The writer compares with the revision after its commit, the index already has its uncommitted changes
+        if index is None or index['revision'] != _pending_revision(db, game_id):
+            index = self._games[key] = self._build(db, game_id)
+        return index
+
+    def _update_conflicts(self, index, slot):
+        if len(set(index['slots'].get(slot, {}).values())) > 1: index['conflicts'].add(slot)
+        else: index['conflicts'].discard(slot)
+
+    def _add(self, index, binding_id, key_id, modifier_id, action_id):
+        slot = (key_id, modifier_id)
+        index['bindings'][binding_id] = slot
+        index['slots'].setdefault(slot, {})[binding_id] = action_id
+        self._update_conflicts(index, slot)
+
+    def _remove(self, index, binding_id):
+        slot = index['bindings'].pop(binding_id, None)
+        if slot is None: return None
+        action_id = index['slots'][slot].pop(binding_id)
+        if not index['slots'][slot]: del index['slots'][slot]
+        self._update_conflicts(index, slot)
+        return action_id
+
+    def clashes(self, db, game_id: int, key_id: int, modifier_id: int, action_id: int = None) -> list:
+        """Ids of the bindings of other actions than `action_id` on this key and modifier"""
+        with self._lock:
+            slot = self._index(db, game_id)['slots'].get((key_id, modifier_id), {})
+            return [b for b, a in slot.items() if a != action_id]
+
+    def conflicts(self, db, game_id: int) -> dict:
+        """The key and modifier combinations bound to more than one action, with the ids of their bindings"""
+        with self._lock:
+            index = self._index(db, game_id)
+            return {slot: list(index['slots'][slot]) for slot in index['conflicts']}
+
+    def binding_changed(self, db, game_id: int, binding_id: int,
+                        key_id: int = None, # New key of the binding, None when the binding was deleted
+                        modifier_id: int = None,
+                        action_id: int = None # Action of the binding, needed for new bindings
+                        ) -> list:
+        """Bump the revision of the game after a write to one of its bindings, and update its index in place.
+        Returns the ids of the bindings of other actions that the binding now clashes with."""
+        with self._lock:
+            key = (db.conn.filename, game_id)
+            index, before = self._games.get(key), _pending_revision(db, game_id)
+            bump_revision(db, game_id)
+            after = _pending_revision(db, game_id)
+            # Only an index that was up to date before this write, without other writes in between, can be updated.
+            # The writes that are committed together bump the revision once.
+            if index is None or index['revision'] != before or after - before > 1:
+                self._games.pop(key, None)
+            else:
+                action_id = self._remove(index, binding_id) or action_id
+                if key_id is not None: self._add(index, binding_id, key_id, modifier_id, action_id)
+                index['revision'] = after
+            if key_id is None: return []
+            return [b for b in self.clashes(db, game_id, key_id, modifier_id, action_id) if b != binding_id]
+
+    def clear(self):
+        with self._lock: self._games.clear()
+
+conflict_index = ConflictIndex()
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 11
+class Catalog:
+    """In-memory copy of the lookup tables, reloaded when the shared revision of the database changes.
+    The rows are shared between callers, don't modify them."""
+    tables = ['categories', 'actions', 'game_keys', 'modifiers']
+
+    def __init__(self):
+        self._copies = {}
+        self._lock = threading.Lock()
+
+    def _copy(self, db):
+        # In-memory databases have no filename and can't be shared between connections
+        key, version = db.conn.filename or id(db.conn), game_revision(db, None)
+        copy = self._copies.get(key)
+        if copy is None or copy['version'] != version or (copy['conn'] and copy['conn']() is not db.conn):
+            copy = dict(version=version, rows={}, ids={}, conn=None if db.conn.filename else weakref.ref(db.conn))
+            for table in self.tables:
+                copy['rows'][table], copy['ids'][table] = {}, {}
+                if table in db.t:
+                    for row in db.q(f"SELECT * FROM {table} ORDER BY id"): self._add(copy, table, row)
+            with self._lock: self._copies[key] = copy
+        return copy
+
+    def _add(self, copy, table, row):
+        copy['rows'][table][row['id']] = row
+        # With duplicate names the first row wins, like a `rows_where` lookup
+        copy['ids'][table].setdefault(row['name'], row['id'])
+        return row
+
+    def rows(self, db, table: str) -> list:
+        """All rows of the table, ordered by id"""
+        return list(self._copy(db)['rows'][table].values())
+
+    def row(self, db, table: str, row_id: int) -> dict:
+        """The row with this id, or None"""
+        copy = self._copy(db)
+        row = copy['rows'][table].get(row_id)
+        if row is None and row_id is not None:
+            found = db.q(f"SELECT * FROM {table} WHERE id = ?", [row_id])
+            if found: row = self._add(copy, table, found[0])
+        return row
+
+    def id(self, db, table: str, name: str) -> int:
+        """The id of the first row with this name, or None"""
+        copy = self._copy(db)
+        row_id = copy['ids'][table].get(name)
+        if row_id is None and name is not None:
+            found = db.q(f"SELECT * FROM {table} WHERE name = ? ORDER BY id LIMIT 1", [name])
+            if found: row_id = self._add(copy, table, found[0])['id']
+        return row_id
+
+    def clear(self):
+        with self._lock: self._copies.clear()
+
+catalog = Catalog()
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 14
 def add_binding(db, game_name: str, action_name: str, key_name: str, modifier_name: str = 'tap', description: str = None, sort_order: int = 0):
     """Add a key binding for a specific game and action"""
     game = next(db.t.games.rows_where("name = ?", [game_name]), None)
     if not game:
         raise ValueError(f"Game '{game_name}' not found")
         
-    action = next(db.t.actions.rows_where("name = ?", [action_name]), None)
-    if not action:
+    action_id = catalog.id(db, 'actions', action_name)
+    if action_id is None:
         raise ValueError(f"Action '{action_name}' not found")
         
-    key = next(db.t.game_keys.rows_where("name = ?", [key_name]), None)
-    if not key:
+    key_id = catalog.id(db, 'game_keys', key_name)
+    if key_id is None:
         raise ValueError(f"Key '{key_name}' not found")
         
-    modifier = next(db.t.modifiers.rows_where("name = ?", [modifier_name]), None)
-    if not modifier:
+    modifier_id = catalog.id(db, 'modifiers', modifier_name)
+    if modifier_id is None:
         raise ValueError(f"Modifier '{modifier_name}' not found")
         
-    return db.t.bindings.insert(dict(
+    binding = db.t.bindings.insert(dict(
         game_id=game['id'],
-        action_id=action['id'],
-        key_id=key['id'],
-        modifier_id=modifier['id'],
+        action_id=action_id,
+        key_id=key_id,
+        modifier_id=modifier_id,
         description=description,
         sort_order=sort_order
     ))
+    conflict_index.binding_changed(db, game['id'], binding['id'], key_id, modifier_id, action_id)
+    return binding
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 16
+def insert_binding(db, game_id: int, action_id: int, key_id: int, modifier_id: int, description: str = None) -> tuple:
+    """Add a binding by ids. Returns the binding and the ids of the bindings of other actions it clashes with."""
+    binding = db.t.bindings.insert(dict(game_id=game_id, action_id=action_id, key_id=key_id, modifier_id=modifier_id, description=description))
+    return binding, conflict_index.binding_changed(db, game_id, binding['id'], key_id, modifier_id, action_id)
+
+def update_binding(db, binding_id: int, key_id: int, modifier_id: int, description: str = None) -> tuple:
+    """Bind a binding to another key and modifier. Returns the binding and the ids of the bindings of other actions it clashes with."""
+    binding = db.t.bindings.update(dict(id=binding_id, key_id=key_id, modifier_id=modifier_id, description=description))
+    return binding, conflict_index.binding_changed(db, binding['game_id'], binding_id, key_id, modifier_id, binding['action_id'])
 
-# %% ../nbs/01_manipulate_db_contents.ipynb 5
+def delete_binding(db, binding_id: int) -> dict:
+    """Delete a binding, returns the deleted row"""
+    binding = db.t.bindings[binding_id]
+    db.t.bindings.delete(binding_id)
+    conflict_index.binding_changed(db, binding['game_id'], binding_id)
+    return binding
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 18
+image_max_bytes = 5 * 1024 * 1024 # Largest image that is downloaded for a game
+image_timeout = httpx.Timeout(10.0, connect=5.0)
+image_limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+_image_client = None
+
+def image_client() -> httpx.AsyncClient:
+    """Shared async client for downloading game images, so connections to image hosts are reused"""
+    global _image_client
+    if _image_client is None or _image_client.is_closed:
+        _image_client = httpx.AsyncClient(timeout=image_timeout, limits=image_limits, follow_redirects=True)
+    return _image_client
+
+async def close_image_client():
+    """Close the shared image client, register this as a shutdown handler of the app"""
+    if _image_client is not None:
+        await _image_client.aclose()
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 19
+def _check_image_size(response, size, max_bytes):
+    if int(response.headers.get('content-length', 0)) > max_bytes or size > max_bytes:
+        raise ValueError(f"Image at {response.url} is larger than {max_bytes} bytes")
+
+async def fetch_image(image_url: str, # URL of the image to download
+                      max_bytes: int = image_max_bytes, # Maximum size of the image
+                      client: httpx.AsyncClient = None # Client to use, defaults to the shared `image_client`
+                      ) -> bytes:
+    """Download an image without blocking, streaming the body into a spooled buffer"""
+    client = client or image_client()
+    async with client.stream('GET', image_url) as response:
+        response.raise_for_status()
+        _check_image_size(response, 0, max_bytes)
+        with SpooledTemporaryFile(max_size=1024 * 1024) as buffer:
+            async for chunk in response.aiter_bytes():
+                _check_image_size(response, buffer.tell() + len(chunk), max_bytes)
+                buffer.write(chunk)
+            buffer.seek(0)
+            return buffer.read()
+
+def download_image(image_url: str, # URL of the image to download
+                   max_bytes: int = image_max_bytes # Maximum size of the image
+                   ) -> bytes:
+    """Blocking variant of `fetch_image` for scripts and notebooks"""
+    with httpx.stream('GET', image_url, timeout=image_timeout, follow_redirects=True) as response:
+        response.raise_for_status()
+        _check_image_size(response, 0, max_bytes)
+        with SpooledTemporaryFile(max_size=1024 * 1024) as buffer:
+            for chunk in response.iter_bytes():
+                _check_image_size(response, buffer.tell() + len(chunk), max_bytes)
+                buffer.write(chunk)
+            buffer.seek(0)
+            return buffer.read()
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 20
 def upsert_game(db: database, # Database connection
                 name: str, # Name of the game to add to database
                 game_type: str = None, # Type of game to add. Currently only 'dumb' and 'tactical' are possible.
                 image_url: str = None # URL of the image to add to database, the image will be downloaded and addes as jpg file.
                 ):
-    """Update existing game or insert new one if it doesn't exist"""
+    """Update existing game or insert new one if it doesn't exist.
+    Pass no `image_url` and use `update_game_image` as a background task to download the image without blocking."""
     # Try to find existing game with this name
     existing = db.t.games.rows_where("name = ?", [name])
     game = next(existing, None)  # Get first match or None
     
-    if image_url:
-        response = httpx_get(image_url)
-        if response.is_success:
-            image = response.content
-    else:
-        image = None
+    image = download_image(image_url) if image_url else None
     
-    game_data = {"name":name, "game_type":game_type, "image":image}
+    game_data = {"name":name, "game_type":game_type, "image":image, "image_sha256":image_digest(image)}
 
     if game:
         # Update existing game
         game_data['id'] = game['id']
-        return db.t.games.update(game_data)
+        game = db.t.games.update(game_data)
     else:
         # Add new game
-        return db.t.games.insert(game_data)
+        game = db.t.games.insert(game_data)
+    bump_revision(db, game['id'])
+    return game
 
+# %% ../nbs/01_manipulate_db_contents.ipynb 21
+def store_game_image(db: database, game_id: int, image: bytes):
+    game = db.t.games.update(dict(id=game_id, image=image, image_sha256=image_digest(image)))
+    bump_revision(db, game_id)
+    return game
 
-# %% ../nbs/01_manipulate_db_contents.ipynb 6
+def game_image_digest(db: database, game_id: int) -> str:
+    """SHA-256 of the image of a game, from the stored digest without reading the image, or None when the game has no image"""
+    row = db.execute("SELECT image IS NOT NULL, image_sha256 FROM games WHERE id = ?", [game_id]).fetchone()
+    if not row or not row[0]: return None
+    # The image was written without its digest, outside of `store_game_image`
+    return row[1] or image_digest(db.execute("SELECT image FROM games WHERE id = ?", [game_id]).fetchone()[0])
+
+async def update_game_image(db: database, # Database connection
+                            game_id: int, # Id of the existing game
+                            image_url: str, # URL of the image to download
+                            max_bytes: int = image_max_bytes, # Maximum size of the image
+                            writes = None # A `WriteQueue` to store the image through, writes to `db` directly when None
+                            ):
+    """Download the image of an existing game and store it, meant to run as a background task after `upsert_game`"""
+    try:
+        image = await fetch_image(image_url, max_bytes)
+    # A malformed url like `http://[::1` raises `InvalidURL`, which is no `HTTPError`
+    except (httpx.HTTPError, httpx.InvalidURL, ValueError) as e:
+        print(f"Could not download image for game {game_id}: {e}")
+        return None
+    if writes is None: return store_game_image(db, game_id, image)
+    return await asyncio.wrap_future(writes.submit(store_game_image, game_id, image))
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 22
 def delete_game(db: database, # Database connection, 
                 game_id: int # Id of the game
                 ):
@@ -79,85 +396,264 @@ def delete_game(db: database, # Database connection,
     # Delete the game itself
     game_name = db.t.games[game_id]['name']
     db.t.games.delete_where("id = ?", [game_id])
+    bump_revision(db, game_id)
 
     return f"Deleted game '{game_name}'"
 
-# %% ../nbs/01_manipulate_db_contents.ipynb 20
+# %% ../nbs/01_manipulate_db_contents.ipynb 24
+def reorder_bindings(db: database, # Database connection
+                     game_id: int, # Id of the game the bindings belong to
+                     binding_ids: list, # Binding ids in their new order
+                     step: int = 100 # Gap between the sort_order of consecutive bindings
+                     ):
+    """Apply a new order to the bindings in one transaction, only updating rows whose sort_order changed"""
+    new_order = {binding_id: i * step for i, binding_id in enumerate(binding_ids)}
+    if not new_order: return 0
+    placeholders = ','.join('?' * len(new_order))
+
+    with db.conn:
+        current = db.q(f"SELECT id, sort_order FROM bindings WHERE game_id = ? AND id IN ({placeholders})",
+                       [game_id, *new_order])
+        changed = {b['id']: new_order[b['id']] for b in current if b['sort_order'] != new_order[b['id']]}
+        if changed:
+            cases = ' '.join('WHEN ? THEN ?' for _ in changed)
+            params = [v for item in changed.items() for v in item]
+            db.execute(f"UPDATE bindings SET sort_order = CASE id {cases} END WHERE id IN ({','.join('?' * len(changed))})",
+                       params + list(changed))
+            bump_revision(db, game_id)
+    return len(changed)
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 27
+class WriteQueue:
+    """Runs the writes of all threads on one writer thread, grouping the writes that wait into one transaction"""
+    def __init__(self, factory: ConnectionFactory = None, # Makes the connection of the writer, a factory for the project database when None
+                 max_batch: int = 100, # Most writes in one transaction
+                 busy_retries: int = 5 # Attempts to start a transaction when another process holds the write lock past the busy timeout
+                 ):
+        self.factory, self.max_batch, self.busy_retries = factory or ConnectionFactory(), max_batch, busy_retries
+        self.db, self.commits, self.writes = None, 0, 0
+        self._queue, self._thread, self._lock = queue.Queue(), None, threading.Lock()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Queue `fn(db, *args, **kwargs)` to run on the writer's connection, returns a future of its result"""
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # A write that queues another write runs it right away, in the same transaction
+            try: future.set_result(fn(self.db, *args, **kwargs))
+            except Exception as e: future.set_exception(e)
+            return future
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+            # The write runs in the context of the caller, so the request metrics count its statements
+            self._queue.put((future, contextvars.copy_context(), fn, args, kwargs))
+        return future
+
+    def write(self, fn, *args, **kwargs):
+        """Run `fn(db, *args, **kwargs)` on the writer's connection, wait for the commit and return its result"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def _run(self):
+        try: self.db = self.factory.connect()
+        except Exception as e:
+            # Fail the waiting writes, the next write starts a new writer thread
+            with self._lock:
+                self._thread, waiting = None, []
+                while not self._queue.empty(): waiting.append(self._queue.get_nowait())
+            for item in waiting:
+                if item is not None and item[0].set_running_or_notify_cancel(): item[0].set_exception(e)
+            return
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < self.max_batch:
+                try: batch.append(self._queue.get_nowait())
+                except queue.Empty: break
+            stop = batch[-1] is None
+            if stop: batch.pop()
+            if batch: self._commit(batch)
+            if stop: return self.db.conn.close()
+
+    def _begin(self):
+        for attempt in range(self.busy_retries):
+            try: return self.db.execute("BEGIN IMMEDIATE")
+            except apsw.BusyError:
+                if attempt == self.busy_retries - 1: raise
+                time.sleep(0.05 * 2 ** attempt)
+
+    def _commit(self, batch):
+        outcomes = []
+        with deferred_revisions():
+            try:
+                self._begin()
+                for future, context, fn, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel(): continue
+                    self.db.execute("SAVEPOINT write")
+                    try: outcomes.append((future, context.run(fn, self.db, *args, **kwargs), None))
+                    except Exception as e:
+                        self.db.execute("ROLLBACK TO write")
+                        outcomes.append((future, None, e))
+                    self.db.execute("RELEASE write")
+                self.db.execute("COMMIT")
+            except Exception as e:
+                if not self.db.conn.getautocommit(): self.db.execute("ROLLBACK")
+                # Writes that didn't get to run, because the transaction couldn't start, fail as well
+                outcomes = [(future, None, e) for future, *_ in batch
+                            if future.running() or future.set_running_or_notify_cancel()]
+        self.commits, self.writes = self.commits + 1, self.writes + len(outcomes)
+        for future, result, error in outcomes:
+            if error is None: future.set_result(result)
+            else: future.set_exception(error)
+
+    def close(self):
+        """Finish the queued writes and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None: self._queue.put(None)
+        if thread is not None: thread.join()
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 49
 def add_new_action(db: database, # Database connection
                    action: str, # Short description of the action
                    category: str, # Category the action belongs to
                    default_keybinding: str, # Default keybinding for the action
                    default_modifier: str # Default modifier for the action
                    ):
-    categories = {c['name']: c['id'] for c in db.t.categories()}
+    category_id = catalog.id(db, 'categories', category)
 
-    if category not in categories.keys():
-        db.t.categories.insert(dict(name=category, description='wat denk je zelf?'))
-        categories = {c['name']: c['id'] for c in db.t.categories()}
+    if category_id is None:
+        category_id = db.t.categories.insert(dict(name=category, description='wat denk je zelf?'))['id']
 
     db.t.actions.insert(dict(
             name=action,
-            category_id=categories[category]
+            category_id=category_id
             ))
+    # The new action shows up in the tables of every game
+    bump_revision(db)
 
     add_binding(db, 'default', action, default_keybinding, default_modifier)
 
-# %% ../nbs/01_manipulate_db_contents.ipynb 22
+# %% ../nbs/01_manipulate_db_contents.ipynb 51
+def clone_bindings(db: database, # Database connection
+                   source_game: str, # Name of the game to copy the bindings from
+                   target_game: str # Name of the game that gets the bindings, its existing bindings are replaced
+                   ):
+    """Replace all bindings of the target game with a copy of the bindings of the source game"""
+    source = next(db.t.games.rows_where("name = ?", [source_game]), None)
+    if not source:
+        raise ValueError(f"Game '{source_game}' not found")
+
+    target = next(db.t.games.rows_where("name = ?", [target_game]), None)
+    if not target:
+        raise ValueError(f"Game '{target_game}' not found")
+
+    if source['id'] == target['id']: return 0
+
+    with db.conn:
+        db.execute("DELETE FROM bindings WHERE game_id = ?", [target['id']])
+        db.execute("""
+            INSERT INTO bindings (game_id, action_id, key_id, modifier_id, description, sort_order)
+            SELECT ?, action_id, key_id, modifier_id, description, sort_order
+            FROM bindings WHERE game_id = ? ORDER BY id""", [target['id'], source['id']])
+        copied = db.conn.changes()
+    bump_revision(db, target['id'])
+    return copied
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 52
 def copy_default_bindings(db, new_game_name: str):
     """Copy all bindings from default game to a new game"""
-    # Get the new game
-    new_game = next(db.t.games.rows_where("name = ?", [new_game_name]), None)
-    if not new_game:
-        raise ValueError(f"Game '{new_game_name}' not found")
-    
-    # Get default game
-    default_game = next(db.t.games.rows_where("name = ?", ["default"]), None)
-    if not default_game:
-        raise ValueError("Default game template not found")
-    
-    db.t.bindings.delete_where("game_id = ?", [new_game['id']])
-    
-    # Get all default bindings
-    default_bindings = db.t.bindings.rows_where("game_id = ?", [default_game['id']])
-    
-    # Copy each binding to new game
-    for binding in default_bindings:
-        db.t.bindings.insert({
-            'game_id': new_game['id'],
-            'action_id': binding['action_id'],
-            'key_id': binding['key_id'],
-            'modifier_id': binding['modifier_id'],
-            'description': binding['description'],
-            'sort_order': binding['sort_order']
-        }),
-
-# %% ../nbs/01_manipulate_db_contents.ipynb 26
-def compare_with_default(db, game_name: str):
-    """Compare a game's bindings with default bindings and return differences"""
-    # Get both games
+    return clone_bindings(db, 'default', new_game_name)
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 53
+def reset_game_bindings(db: database, # Database connection
+                        game_id: int, # Game that gets the bindings of the source game
+                        source_game: str = 'default' # Name of the game to copy the bindings from
+                        ) -> list:
+    """Make the bindings of a game equal to those of the source game, rewriting only the actions whose bindings differ.
+    Returns the ids of the categories of those actions; the bindings of the other actions keep their ids."""
+    source = next(db.t.games.rows_where("name = ?", [source_game]), None)
+    if not source:
+        raise ValueError(f"Game '{source_game}' not found")
+    if not db.t.games.count_where("id = ?", [game_id]):
+        raise ValueError(f"Game {game_id} not found")
+    if source['id'] == game_id: return []
+
+    with db.conn:
+        actions = json.dumps([r[0] for r in db.execute("""
+            WITH signatures AS (
+                     SELECT game_id, action_id,
+                            json_group_array(json_array(key_id, modifier_id, description, sort_order) ORDER BY sort_order, id) AS signature
+                     FROM bindings WHERE game_id IN (:game, :source) GROUP BY game_id, action_id),
+                 g AS (SELECT * FROM signatures WHERE game_id = :game),
+                 s AS (SELECT * FROM signatures WHERE game_id = :source)
+            SELECT coalesce(g.action_id, s.action_id) FROM g FULL OUTER JOIN s ON s.action_id = g.action_id
+            WHERE g.signature IS NOT s.signature""", dict(game=game_id, source=source['id']))])
+        if actions == '[]': return []
+        db.execute("DELETE FROM bindings WHERE game_id = ? AND action_id IN (SELECT value FROM json_each(?))", [game_id, actions])
+        db.execute("""
+            INSERT INTO bindings (game_id, action_id, key_id, modifier_id, description, sort_order)
+            SELECT ?, action_id, key_id, modifier_id, description, sort_order
+            FROM bindings WHERE game_id = ? AND action_id IN (SELECT value FROM json_each(?)) ORDER BY id""",
+            [game_id, source['id'], actions])
+        categories = [r[0] for r in db.execute(
+            "SELECT DISTINCT category_id FROM actions WHERE id IN (SELECT value FROM json_each(?)) ORDER BY category_id", [actions])]
+    bump_revision(db, game_id)
+    return categories
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 60
+# Per game and action: the bindings as readable text, and a signature of the key and modifier ids to compare them by
+_binding_signatures = """
+    SELECT b.game_id, b.action_id,
+           group_concat(coalesce(k.name, '?') || ' (' || coalesce(m.name, '?') || ')', ', ' ORDER BY b.sort_order, b.id) AS bindings,
+           group_concat(coalesce(b.key_id, '') || ':' || coalesce(b.modifier_id, ''), ',' ORDER BY b.key_id, b.modifier_id) AS signature
+    FROM bindings b
+    LEFT JOIN game_keys k ON k.id = b.key_id
+    LEFT JOIN modifiers m ON m.id = b.modifier_id"""
+
+def compare_with_default(db: database, # Database connection
+                         game_name: str # Name of the game to compare
+                         ) -> list:
+    """Actions whose bindings differ from the default game: 'changed', 'missing' from the game or 'extra' in the game"""
     game = next(db.t.games.rows_where("name = ?", [game_name]), None)
     default = next(db.t.games.rows_where("name = ?", ["default"]), None)
-    
+
     if not game:
         raise ValueError(f"Game '{game_name}' not found")
     if not default:
         raise ValueError("Default game template not found")
-    
-    # Get bindings for both games
-    game_bindings = db.t.bindings.rows_where("game_id = ?", [game['id']])
-    default_bindings = db.t.bindings.rows_where("game_id = ?", [default['id']])
-    
-    # Create dictionaries with action_id as key for easy comparison
-    game_dict = {b['action_id']: (b['key_id'], b['modifier_id']) for b in game_bindings}
-    default_dict = {b['action_id']: (b['key_id'], b['modifier_id']) for b in default_bindings}
-    
-    # Find differences
-    differences = {}
-    for action_id, (key_id, mod_id) in game_dict.items():
-        if action_id in default_dict and (key_id, mod_id) != default_dict[action_id]:
-            differences[action_id] = {
-                'game': (key_id, mod_id),
-                'default': default_dict[action_id]
-            }
-    
-    return differences
+
+    return db.q(f"""
+        WITH signatures AS ({_binding_signatures} WHERE b.game_id IN (:game, :default) GROUP BY b.game_id, b.action_id),
+             g AS (SELECT * FROM signatures WHERE game_id = :game),
+             d AS (SELECT * FROM signatures WHERE game_id = :default)
+        SELECT coalesce(g.action_id, d.action_id) AS action_id, a.name AS action, c.name AS category,
+               CASE WHEN g.action_id IS NULL THEN 'missing' WHEN d.action_id IS NULL THEN 'extra' ELSE 'changed' END AS status,
+               g.bindings AS game, d.bindings AS "default"
+        FROM g FULL OUTER JOIN d ON d.action_id = g.action_id
+        LEFT JOIN actions a ON a.id = coalesce(g.action_id, d.action_id)
+        LEFT JOIN categories c ON c.id = a.category_id
+        WHERE g.signature IS NOT d.signature
+        ORDER BY c.id, a.id""", dict(game=game['id'], default=default['id']))
+
+# %% ../nbs/01_manipulate_db_contents.ipynb 61
+def compare_all_with_default(db: database # Database connection
+                             ) -> list:
+    """Per game the number of actions that are changed, missing or extra compared to the default game, in one pass"""
+    default = next(db.t.games.rows_where("name = ?", ["default"]), None)
+    if not default:
+        raise ValueError("Default game template not found")
+
+    return db.q(f"""
+        WITH signatures AS ({_binding_signatures} GROUP BY b.game_id, b.action_id),
+             d AS (SELECT action_id, signature FROM signatures WHERE game_id = :default),
+             counts AS (
+                SELECT g.id AS game_id, g.name AS game,
+                       coalesce(sum(d.action_id IS NOT NULL AND s.signature IS NOT d.signature), 0) AS changed,
+                       (SELECT count(*) FROM d) - coalesce(sum(d.action_id IS NOT NULL), 0) AS missing,
+                       coalesce(sum(s.action_id IS NOT NULL AND d.action_id IS NULL), 0) AS extra
+                FROM games g
+                LEFT JOIN signatures s ON s.game_id = g.id
+                LEFT JOIN d ON d.action_id = s.action_id
+                WHERE g.id != :default
+                GROUP BY g.id)
+        SELECT *, changed + missing + extra AS divergence FROM counts ORDER BY game""", dict(default=default['id']))
@@ -0,0 +1,126 @@
+"""Per-route latency, response size and SQL statement metrics for the FastHTML app, exposed in the Prometheus text format."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/06_metrics.ipynb.
+
+# %% auto 0
+__all__ = ['Histogram', 'route_template', 'RouteMetrics', 'MetricsMiddleware']
+
+# %% ../nbs/06_metrics.ipynb 3
+import os, time, threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from fastcore.test import *
+from fasthtml.common import *
+
+# %% ../nbs/06_metrics.ipynb 5
+class Histogram:
+    """Cumulative histogram in the Prometheus style, with fixed bucket upper bounds"""
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1) # The last one counts the values above every bucket
+        self.sum, self.count = 0, 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        """Lines of the Prometheus text format for this histogram"""
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else f'{bound:g}'
+            yield f'{name}_bucket{{{labels},le="{le}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum:g}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+# %% ../nbs/06_metrics.ipynb 8
+_request_queries = ContextVar('request_queries', default=None)
+
+def route_template(scope):
+    """Route of a request with its path parameters as placeholders, like `/game/{game_id}`"""
+    if 'endpoint' not in scope: return '<unmatched>'
+    segments = scope['path'].split('/')
+    for name, value in scope.get('path_params', {}).items():
+        for i, segment in enumerate(segments):
+            if segment == str(value):
+                segments[i] = f'{{{name}}}'
+                break
+    return '/'.join(segments)
+
+# %% ../nbs/06_metrics.ipynb 10
+class RouteMetrics:
+    """Latency, response size and number of SQL statements per route"""
+    latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+    size_buckets = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+    query_buckets = (0, 1, 2, 5, 10, 20, 50, 100)
+
+    def __init__(self, enabled: bool = None # Defaults to the `KBFPS_METRICS` environment variable
+                 ):
+        self.enabled = os.environ.get('KBFPS_METRICS') == '1' if enabled is None else enabled
+        self.routes = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method, route, seconds, size, queries):
+        with self._lock:
+            if (method, route) not in self.routes:
+                self.routes[method, route] = (Histogram(self.latency_buckets), Histogram(self.size_buckets), Histogram(self.query_buckets))
+            latency, sizes, statements = self.routes[method, route]
+            latency.observe(seconds)
+            sizes.observe(size)
+            statements.observe(queries)
+
+    def middleware(self):
+        """Middleware for `fast_app`, empty when the metrics are disabled"""
+        return [Middleware(MetricsMiddleware, metrics=self)] if self.enabled else []
+
+    def track_queries(self, db):
+        """Count the SQL statements each request runs on the connection of `db`"""
+        if not self.enabled: return
+        previous = db.conn.exec_trace
+        def trace(cursor, sql, bindings):
+            counter = _request_queries.get()
+            if counter is not None: counter[0] += 1
+            return previous(cursor, sql, bindings) if previous else True
+        db.conn.exec_trace = trace
+
+    def render(self):
+        """All metrics in the Prometheus text format"""
+        metrics = [('kbfps_request_duration_seconds', 'Request latency per route'),
+                   ('kbfps_response_size_bytes', 'Response body size per route'),
+                   ('kbfps_request_sql_statements', 'SQL statements executed per request')]
+        with self._lock:
+            lines = []
+            for i, (name, description) in enumerate(metrics):
+                lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+                for (method, route), histograms in sorted(self.routes.items()):
+                    lines += histograms[i].lines(name, f'method="{method}",route="{route}"')
+        return '\n'.join(lines) + '\n'
+
+    def response(self):
+        """Response for the /metrics route, a 404 when the metrics are disabled"""
+        if not self.enabled: return Response('Metrics are disabled, set KBFPS_METRICS=1 to enable them', status_code=404)
+        return Response(self.render(), media_type='text/plain; version=0.0.4')
+
+# %% ../nbs/06_metrics.ipynb 11
+class MetricsMiddleware:
+    """ASGI middleware that records every http request in a `RouteMetrics`"""
+    def __init__(self, app, metrics: RouteMetrics):
+        self.app, self.metrics = app, metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http': return await self.app(scope, receive, send)
+        size, queries = [0], [0]
+        token = _request_queries.set(queries)
+
+        async def send_counting(message):
+            if message['type'] == 'http.response.body': size[0] += len(message.get('body', b''))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_counting)
+        finally:
+            _request_queries.reset(token)
+            self.metrics.observe(scope['method'], route_template(scope), time.perf_counter() - start, size[0], queries[0])
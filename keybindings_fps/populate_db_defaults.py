@@ -3,67 +3,40 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/02_populate_db_defaults.ipynb.
 
 # %% auto 0
-__all__ = ['populate_categories', 'populate_modifiers', 'populate_game_keys', 'populate_actions', 'create_default_game',
-           'setup_fresh_db']
+__all__ = ['default_data', 'name_to_id', 'populate_categories', 'populate_modifiers', 'populate_game_keys', 'populate_actions',
+           'create_default_game', 'setup_fresh_db']
 
 # %% ../nbs/02_populate_db_defaults.ipynb 3
 from pathlib import Path
+from fastcore.test import *
 from fasthtml.common import *
 from .create_db_structure import *
 from .manipulate_db_contents import *
 
 # %% ../nbs/02_populate_db_defaults.ipynb 4
-def populate_categories(db):
-    """Populate the categories table with initial data"""
+default_data = dict(
     categories = [
         ('movement', 'Movement related actions'),
         ('combat', 'Combat related actions'),
         ('interaction', 'Manipulate the environment'),
         ('communication', 'Communicate with friends and bots'),
         ('menu', 'Access the menus')
-    ]
-    
-    for name, description in categories:
-        db.t.categories.insert(dict(name=name, description=description))
-
-
-# %% ../nbs/02_populate_db_defaults.ipynb 5
-def populate_modifiers(db):
-    """Populate the modifiers table with initial data"""
-    modifiers = ['tap', 'hold', 'scroll', 'double_tap']
-    
-    for name in modifiers:
-        db.t.modifiers.insert(dict(name=name))
-
-# %% ../nbs/02_populate_db_defaults.ipynb 6
-def populate_game_keys(db):
-    """Populate the game_keys table with initial data"""
-    # Letters
-    letters = [chr(i) for i in range(ord('a'), ord('z')+1)]
-    
-    # Numbers
-    numbers = [str(i) for i in range(10)]
-    
-    # Function keys
-    function_keys = [f'f{i}' for i in range(1, 13)]
-    
-    # Special keys
-    special_keys = ['left_alt', 'enter', 'space', 'left_control', 'tab', '.', 
-                   'left_shift', 'esc', 'del', ';', '-', '`', '=', "'",
-                   'mouse_left', 'mouse_right', 'mouse_side_front', 
-                   'mouse_side_back', 'mouse_middle', 'mouse_sniper']
-    
-    # Add all keys
-    for key in letters + numbers + function_keys + special_keys:
-        db.t.game_keys.insert(dict(name=key))
-
-# %% ../nbs/02_populate_db_defaults.ipynb 7
-def populate_actions(db):
-    """Populate the actions table with initial data"""
-    # Get category IDs for reference
-    categories = {c['name']: c['id'] for c in db.t.categories()}
-    
-    actions_by_category = {
+    ],
+    modifiers = ['tap', 'hold', 'scroll', 'double_tap'],
+    game_keys = (
+        # Letters
+        [chr(i) for i in range(ord('a'), ord('z')+1)] +
+        # Numbers
+        [str(i) for i in range(10)] +
+        # Function keys
+        [f'f{i}' for i in range(1, 13)] +
+        # Special keys
+        ['left_alt', 'enter', 'space', 'left_control', 'tab', '.', 
+         'left_shift', 'esc', 'del', ';', '-', '`', '=', "'",
+         'mouse_left', 'mouse_right', 'mouse_side_front', 
+         'mouse_side_back', 'mouse_middle', 'mouse_sniper']
+    ),
+    actions = {
         'movement': [
             'Forward', 'Backward', 'Left', 'Right', 'Jump/climb', 
             'Crouch', 'Prone', 'Sprint', 'Walk', 'Lean left', 'Lean right'
@@ -75,28 +48,9 @@ def populate_actions(db):
         'interaction': ['Use'],
         'communication': ['Voice', 'Text', 'Ping', 'Emote'],
         'menu': ['Menu', 'Map', 'Inventory', 'Special']
-    }
-    
-    # Add all actions with their category IDs
-    for category, actions in actions_by_category.items():
-        for action in actions:
-            db.t.actions.insert(dict(
-                name=action,
-                category_id=categories[category]
-            ))
-
-
-# %% ../nbs/02_populate_db_defaults.ipynb 8
-def create_default_game(db):
-    """Create the default game template with standard bindings"""
-    # Create default game
-    db.t.games.insert(dict(
-        name='default',
-        game_type='template',
-        image=None
-    ))
-
-    # Default bindings dictionary with category-based sort_order
+    },
+    default_game = dict(name='default', game_type='template', image=None),
+    # Default bindings with category-based sort_order: action: (key, modifier, description, sort_order)
     default_bindings = {
         # Movement (100-199)
         'Forward': ('w', 'hold', None, 101),
@@ -135,23 +89,81 @@ def create_default_game(db):
         'Map': ('m', 'tap', None, 502),
         'Inventory': ('tab', 'tap', None, 503)
     }
+)
 
-    # Add all bindings using existing add_binding function
-    for action, (key, modifier, description, sort_order) in default_bindings.items():
-        add_binding(db, 'default', action, key, modifier, description, sort_order)
+# %% ../nbs/02_populate_db_defaults.ipynb 5
+def name_to_id(db, table):
+    """Map the names in `table` to their ids. With duplicate names the first row wins, like a `rows_where` lookup."""
+    ids = {}
+    for row in db.q(f"SELECT id, name FROM {table} ORDER BY id"):
+        ids.setdefault(row['name'], row['id'])
+    return ids
+
+# %% ../nbs/02_populate_db_defaults.ipynb 6
+def populate_categories(db, data=default_data):
+    """Populate the categories table with initial data"""
+    db.t.categories.insert_all(dict(name=name, description=description) for name, description in data['categories'])
+    bump_revision(db)
+
+# %% ../nbs/02_populate_db_defaults.ipynb 7
+def populate_modifiers(db, data=default_data):
+    """Populate the modifiers table with initial data"""
+    db.t.modifiers.insert_all(dict(name=name) for name in data['modifiers'])
+    bump_revision(db)
+
+# %% ../nbs/02_populate_db_defaults.ipynb 8
+def populate_game_keys(db, data=default_data):
+    """Populate the game_keys table with initial data"""
+    db.t.game_keys.insert_all(dict(name=key) for key in data['game_keys'])
+    bump_revision(db)
 
 # %% ../nbs/02_populate_db_defaults.ipynb 9
-def setup_fresh_db():
+def populate_actions(db, data=default_data):
+    """Populate the actions table with initial data"""
+    # Get category IDs for reference
+    categories = name_to_id(db, 'categories')
+    
+    # Add all actions with their category IDs
+    db.t.actions.insert_all(dict(name=action, category_id=categories[category])
+                            for category, actions in data['actions'].items() for action in actions)
+    bump_revision(db)
+
+# %% ../nbs/02_populate_db_defaults.ipynb 10
+def create_default_game(db, data=default_data):
+    """Create the default game template with standard bindings"""
+    # Create default game
+    game_id = db.t.games.insert(data['default_game'])['id']
+
+    # Resolve the names once instead of looking them up for every binding
+    actions, keys, modifiers = name_to_id(db, 'actions'), name_to_id(db, 'game_keys'), name_to_id(db, 'modifiers')
+
+    db.t.bindings.insert_all(dict(
+        game_id=game_id,
+        action_id=actions[action],
+        key_id=keys[key],
+        modifier_id=modifiers[modifier],
+        description=description,
+        sort_order=sort_order
+    ) for action, (key, modifier, description, sort_order) in data['default_bindings'].items())
+
+# %% ../nbs/02_populate_db_defaults.ipynb 11
+def setup_fresh_db(data_dir: Path = None, # Optional path to data directory. If None, uses project's data dir
+                   data: dict = default_data # Seed data to load, see `default_data`
+                   ):
     """Create a fresh database with all initial data"""
-    db = init_db()
-    create_tables(db)
-    populate_categories(db)
-    populate_modifiers(db)
-    populate_game_keys(db)
-    populate_actions(db)
-    create_default_game(db)
+    db = init_db(data_dir)
+    # Seed everything in one transaction, so a fresh database costs a single commit
+    with db.conn:
+        create_tables(db)
+        populate_categories(db, data)
+        populate_modifiers(db, data)
+        populate_game_keys(db, data)
+        populate_actions(db, data)
+        create_default_game(db, data)
+    # Cached renders of an older database at the same path are stale
+    bump_revision(db)
     return db
 
-# %% ../nbs/02_populate_db_defaults.ipynb 11
+# %% ../nbs/02_populate_db_defaults.ipynb 13
 #db = setup_fresh_db()
 #db.t.categories()
@@ -0,0 +1,183 @@
+"""Export the print layouts of many games at once to standalone HTML files, and to PDF when a converter is installed."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/10_print_export.ipynb.
+
+# %% auto 0
+__all__ = ['print_css', 'pdf_converters', 'standalone_html', 'game_filename', 'game_stamps', 'find_pdf_converter', 'html_to_pdf',
+           'export_print_layouts', 'print_export_cli']
+
+# %% ../nbs/10_print_export.ipynb 3
+import hashlib, json, os, re, shutil, subprocess
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from fastcore.script import call_parse, store_true
+from fastcore.test import *
+from fasthtml.common import *
+
+from .create_db_structure import *
+from .manipulate_db_contents import *
+from .gui_binding_tables import code_version, create_bindings_table_print
+
+# %% ../nbs/10_print_export.ipynb 5
+print_css = """
+@page { size: A4 landscape; margin: 10mm; }
+body { font-family: system-ui, -apple-system, "Segoe UI", Roboto, sans-serif; font-size: 10pt; color: #111; margin: 0; }
+h1 { font-size: 16pt; margin: 0 0 8pt; }
+.grid { display: grid; grid-template-columns: repeat(3, minmax(0, 1fr)); gap: 12pt; }
+.uk-card-body > * + * { margin-top: 6pt; }
+.text-lg { font-size: 12pt; }
+.font-bold { font-weight: bold; }
+.text-center { text-align: center; }
+.italic { font-style: italic; }
+.text-gray-500 { color: #6b7280; }
+p { display: inline; margin: 0; }
+table { width: 100%; border-collapse: collapse; break-inside: avoid; }
+th, td { text-align: left; padding: 1pt 4pt; vertical-align: top; }
+th { border-bottom: 1px solid #999; }
+tbody tr:nth-child(odd) { background: #f3f4f6; }
+"""
+
+# %% ../nbs/10_print_export.ipynb 6
+def standalone_html(title: str, # Title of the page, also shown as heading
+                    content, # FT components or html of the page body
+                    css: str = print_css # Stylesheet to inline
+                    ) -> str:
+    """A complete html document that needs no external stylesheets or scripts"""
+    return '<!doctype html>\n' + to_xml(Html(Head(Meta(charset='utf-8'), Title(title), Style(css)),
+                                             Body(H1(title), content)))
+
+def game_filename(game_id: int, name: str) -> str:
+    """File name without extension for the export of a game, unique per id and readable by name"""
+    return f"{game_id:04d}-{re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'game'}"
+
+# %% ../nbs/10_print_export.ipynb 8
+def game_stamps(db: database, # Database connection
+                game_ids: list = None # Ids of the games, all games when None
+                ) -> dict:
+    """Per game id a hash of everything its print layout is rendered from"""
+    # A change to the code that renders the layouts changes every stamp
+    shared = hashlib.sha256(code_version.encode())
+    for table in ['categories', 'actions', 'game_keys', 'modifiers']:
+        for row in db.execute(f"SELECT * FROM {table} ORDER BY id"): shared.update(repr(row).encode())
+
+    games = db.execute("SELECT id, name FROM games ORDER BY id").fetchall()
+    if game_ids is not None: games = [g for g in games if g[0] in set(game_ids)]
+    stamps = {}
+    for game_id, name in games:
+        stamps[game_id] = h = shared.copy()
+        h.update(repr(name).encode())
+    # One pass over the bindings of all games, in the order the print layout uses
+    rows = db.execute("""SELECT game_id, action_id, key_id, modifier_id, description, sort_order FROM bindings
+                         ORDER BY game_id, sort_order, id""")
+    for row in rows:
+        if row[0] in stamps: stamps[row[0]].update(repr(row).encode())
+    return {game_id: h.hexdigest() for game_id, h in stamps.items()}
+
+# %% ../nbs/10_print_export.ipynb 10
+pdf_converters = dict(
+    wkhtmltopdf = ['wkhtmltopdf', '--quiet', '--orientation', 'Landscape', '{html}', '{pdf}'],
+    weasyprint = ['weasyprint', '{html}', '{pdf}'],
+    chromium = ['chromium', '--headless', '--disable-gpu', '--no-pdf-header-footer', '--print-to-pdf={pdf}', '{url}'],
+    chromium_browser = ['chromium-browser', '--headless', '--disable-gpu', '--no-pdf-header-footer', '--print-to-pdf={pdf}', '{url}'],
+    google_chrome = ['google-chrome', '--headless', '--disable-gpu', '--no-pdf-header-footer', '--print-to-pdf={pdf}', '{url}'],
+)
+
+def find_pdf_converter(name: str = None # Name in `pdf_converters`, the first installed one when None
+                       ) -> list:
+    """The command of a headless html to pdf converter that is installed, or None"""
+    for converter in [name] if name else pdf_converters:
+        command = pdf_converters[converter]
+        executable = shutil.which(command[0])
+        if executable: return [executable] + command[1:]
+    return None
+
+def html_to_pdf(command: list, html_path: Path, pdf_path: Path, timeout: int = 60):
+    """Convert an html file to pdf with a command of `find_pdf_converter`"""
+    html_path, pdf_path = Path(html_path).absolute(), Path(pdf_path).absolute()
+    args = [a.format(html=html_path, pdf=pdf_path, url=html_path.as_uri()) for a in command]
+    subprocess.run(args, check=True, timeout=timeout, capture_output=True)
+
+# %% ../nbs/10_print_export.ipynb 12
+_worker = {}
+
+def _init_worker(data_dir, css, pdf_command):
+    _worker.update(db=init_db(Path(data_dir) if data_dir else None), css=css, pdf_command=pdf_command)
+
+def _export_game(game_id: int, name: str, out_dir: str) -> dict:
+    """Write the html, and the pdf when there is a converter, of one game. Runs in a worker process."""
+    html_path = Path(out_dir) / f"{game_filename(game_id, name)}.html"
+    html_path.write_text(standalone_html(name, create_bindings_table_print(_worker['db'], game_id), _worker['css']), encoding='utf-8')
+    files = [html_path.name]
+    if _worker['pdf_command']:
+        pdf_path = html_path.with_suffix('.pdf')
+        html_to_pdf(_worker['pdf_command'], html_path, pdf_path)
+        files.append(pdf_path.name)
+    return dict(files=files)
+
+# %% ../nbs/10_print_export.ipynb 13
+def export_print_layouts(out_dir: Path, # Directory for the html and pdf files and the manifest
+                         data_dir: Path = None, # Directory of the database, the data directory of the project when None
+                         games: list = None, # Names of the games, all games when None
+                         workers: int = None, # Number of worker processes, the number of cores when None, 0 to export in this process
+                         pdf: bool = True, # Also write pdfs when a converter is installed
+                         converter: str = None, # Name of the converter in `pdf_converters`, the first installed one when None
+                         force: bool = False, # Export all games, also the ones that didn't change
+                         css: str = print_css # Stylesheet to inline in every page
+                         ) -> dict:
+    """Export the print layouts of games to standalone html files. Returns per game name 'exported', 'unchanged' or the error."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    db = init_db(Path(data_dir) if data_dir else None)
+    rows = db.q("SELECT id, name FROM games ORDER BY id")
+    if games is not None: rows = [r for r in rows if r['name'] in set(games)]
+    stamps = game_stamps(db, [r['id'] for r in rows])
+
+    manifest_path = out_dir / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8')) if manifest_path.exists() else {}
+    pdf_command = find_pdf_converter(converter) if pdf else None
+    results, todo = {}, []
+    for r in rows:
+        entry = manifest.get(str(r['id']))
+        current = (entry and entry['stamp'] == stamps[r['id']] and (entry.get('pdf') or not pdf_command)
+                   and all((out_dir / f).exists() for f in entry['files']))
+        if current and not force: results[r['name']] = 'unchanged'
+        else: todo.append(r)
+
+    def done(r, outcome):
+        manifest[str(r['id'])] = dict(name=r['name'], stamp=stamps[r['id']], files=outcome['files'], pdf=bool(pdf_command))
+        results[r['name']] = 'exported'
+
+    if workers == 0:
+        _init_worker(data_dir, css, pdf_command)
+        for r in todo:
+            try: done(r, _export_game(r['id'], r['name'], str(out_dir)))
+            except Exception as e: results[r['name']] = f"{type(e).__name__}: {e}"
+    elif todo:
+        with ProcessPoolExecutor(workers or os.cpu_count(), initializer=_init_worker,
+                                 initargs=(str(data_dir) if data_dir else None, css, pdf_command)) as pool:
+            futures = [(r, pool.submit(_export_game, r['id'], r['name'], str(out_dir))) for r in todo]
+            for r, future in futures:
+                try: done(r, future.result())
+                except Exception as e: results[r['name']] = f"{type(e).__name__}: {e}"
+
+    manifest_path.write_text(json.dumps(manifest, indent=1), encoding='utf-8')
+    return results
+
+# %% ../nbs/10_print_export.ipynb 17
+@call_parse
+def print_export_cli(out_dir: str, # Directory for the html and pdf files
+                     games: str = None, # Comma separated names of the games, all games when empty
+                     data_dir: str = None, # Directory of the database, the data directory of the project when empty
+                     workers: int = None, # Number of worker processes, the number of cores when empty
+                     no_pdf: store_true = False, # Only write html files
+                     converter: str = None, # Name of the pdf converter, the first installed one when empty
+                     force: store_true = False # Export all games, also the ones that didn't change
+                     ):
+    "Export the print layouts of games to standalone html and pdf files"
+    results = export_print_layouts(Path(out_dir), Path(data_dir) if data_dir else None, games.split(',') if games else None,
+                                   workers, not no_pdf, converter, force)
+    for name, outcome in results.items():
+        if outcome not in ('exported', 'unchanged'): print(f"{name}: {outcome}")
+    counts = Counter(results.values())
+    if not no_pdf and not find_pdf_converter(converter): print("No pdf converter found, only html files were written")
+    print(f"Exported {counts['exported']} games, {counts['unchanged']} unchanged, {len(results) - counts['exported'] - counts['unchanged']} failed")
@@ -0,0 +1,147 @@
+"""Opt-in SQL profiler for the connection returned by `init_db`: statement timings grouped by route and normalized text, with query plans for the slow ones."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/07_sql_profiler.ipynb.
+
+# %% auto 0
+__all__ = ['normalize_sql', 'full_scans', 'SQLProfiler', 'SQLProfilerMiddleware']
+
+# %% ../nbs/07_sql_profiler.ipynb 3
+import os, re, time, threading
+from contextvars import ContextVar
+import apsw
+from fastcore.test import *
+from fasthtml.common import *
+
+from .create_db_structure import *
+from .metrics import route_template
+
+# %% ../nbs/07_sql_profiler.ipynb 5
+def normalize_sql(sql: str # Statement as executed
+                  ) -> str:
+    """Statement text with literals replaced by `?`, `IN` lists collapsed and whitespace squeezed"""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', 'IN (...)', sql, flags=re.IGNORECASE)
+    return ' '.join(sql.split()).rstrip(';')
+
+# %% ../nbs/07_sql_profiler.ipynb 8
+_request_statements = ContextVar('request_statements', default=None)
+
+def full_scans(plan: list # Details of `EXPLAIN QUERY PLAN`
+               ) -> list:
+    """The steps of a query plan that scan a whole table without an index"""
+    return [step for step in plan if step.startswith('SCAN') and 'USING' not in step]
+
+# %% ../nbs/07_sql_profiler.ipynb 10
+class SQLProfiler:
+    """Statement counts, timings and query plans per route"""
+    background_limit = 1000 # Statements outside a request are grouped once this many are waiting
+
+    def __init__(self, enabled: bool = None, # Defaults to the `KBFPS_SQL_PROFILE` environment variable
+                 threshold_ms: float = 1.0 # Explain the statements that took at least this long
+                 ):
+        self.enabled = os.environ.get('KBFPS_SQL_PROFILE') == '1' if enabled is None else enabled
+        self.threshold_ms = threshold_ms
+        self.stats, self.plans = {}, {}
+        self._background = []
+        self._lock = threading.Lock()
+
+    def install(self, db):
+        """Trace all statements on the connection of `db`"""
+        if not self.enabled: return
+        previous = db.conn.exec_trace
+        def trace(cursor, sql, bindings):
+            if not sql.startswith('EXPLAIN QUERY PLAN'):
+                self._statements().append(dict(sql=sql.strip(), bindings=bindings, start=time.perf_counter_ns(), ns=None))
+                if len(self._background) >= self.background_limit: self._merge('', '<no request>', self._drain())
+            return previous(cursor, sql, bindings) if previous else True
+        def profile(sql, ns):
+            sql = sql.strip()
+            for statement in reversed(self._statements()):
+                if statement['ns'] is None and statement['sql'] == sql:
+                    statement['ns'] = time.perf_counter_ns() - statement['start']
+                    break
+        db.conn.exec_trace = trace
+        db.conn.set_profile(profile)
+
+    def _statements(self):
+        statements = _request_statements.get()
+        return self._background if statements is None else statements
+
+    def _drain(self):
+        with self._lock: drained, self._background[:] = self._background[:], []
+        return drained
+
+    def _merge(self, method, route, statements):
+        with self._lock:
+            for statement in statements:
+                sql = normalize_sql(statement['sql'])
+                stat = self.stats.setdefault((method, route, sql), dict(
+                    method=method, route=route, sql=sql, example=statement['sql'], bindings=statement['bindings'],
+                    count=0, timed=0, total_ms=0.0, max_ms=0.0))
+                stat['count'] += 1
+                if statement['ns'] is None: continue
+                ms = statement['ns'] / 1e6
+                stat['timed'] += 1
+                stat['total_ms'] += ms
+                if ms >= stat['max_ms']: stat['max_ms'], stat['example'], stat['bindings'] = ms, statement['sql'], statement['bindings']
+
+    def middleware(self):
+        """Middleware for `fast_app`, empty when the profiler is disabled"""
+        return [Middleware(SQLProfilerMiddleware, profiler=self)] if self.enabled else []
+
+    def clear(self):
+        """Forget everything that was recorded so far"""
+        self._drain()
+        with self._lock: self.stats.clear()
+
+    def explain(self, db, sql, bindings=None):
+        """Details of the `EXPLAIN QUERY PLAN` of a statement, on the connection of `db`"""
+        if sql not in self.plans:
+            try: self.plans[sql] = [row[3] for row in db.conn.execute(f'EXPLAIN QUERY PLAN {sql}', bindings)]
+            # Not kept, so the next report tries again
+            except apsw.Error as e: return [f'Could not explain: {e}']
+        return self.plans[sql]
+
+    def report(self, db, # Database to explain the slow statements on
+               route: str = None # Only the statements of this route, like `/game/{game_id}`
+               ) -> list:
+        """Statistics per route and statement, slowest in total first, with the query plans of slow statements"""
+        self._merge('', '<no request>', self._drain())
+        with self._lock: stats = [dict(s) for s in self.stats.values() if route is None or s['route'] == route]
+        for stat in stats:
+            bindings = stat.pop('bindings')
+            explain = stat['max_ms'] >= self.threshold_ms and stat['sql'].split(' ', 1)[0].upper() in ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+            stat['plan'] = self.explain(db, stat['example'], bindings) if explain else []
+            stat['full_scans'] = full_scans(stat['plan'])
+        return sorted(stats, key=lambda s: s['total_ms'], reverse=True)
+
+    def html(self, db, route: str = None):
+        """The report as a table"""
+        header = Thead(Tr(*map(Th, ['Route', 'Statement', 'Count', 'Total ms', 'Max ms', 'Query plan'])))
+        rows = [Tr(Td(f"{s['method']} {s['route']}".strip()), Td(Code(s['sql'])), Td(s['count']), Td(f"{s['total_ms']:.2f}"), Td(f"{s['max_ms']:.2f}"),
+                   Td(Strong('Full table scan') if s['full_scans'] else '', Pre('\n'.join(s['plan'])) if s['plan'] else ''))
+                for s in self.report(db, route)]
+        return Table(header, Tbody(*rows))
+
+    def response(self, db, route: str = None, format: str = 'html'):
+        """Response for the /debug/sql route, a 404 when the profiler is disabled"""
+        if not self.enabled: return Response('The SQL profiler is disabled, set KBFPS_SQL_PROFILE=1 to enable it', status_code=404)
+        if format == 'json': return JSONResponse(self.report(db, route))
+        return Titled('SQL profile', self.html(db, route))
+
+# %% ../nbs/07_sql_profiler.ipynb 11
+class SQLProfilerMiddleware:
+    """ASGI middleware that groups the statements of every http request under its route"""
+    def __init__(self, app, profiler: SQLProfiler):
+        self.app, self.profiler = app, profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http': return await self.app(scope, receive, send)
+        statements = []
+        token = _request_statements.set(statements)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_statements.reset(token)
+            self.profiler._merge(scope['method'], route_template(scope), statements)
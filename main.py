@@ -2,81 +2,74 @@
 # from fasthtml_hf import setup_hf_backup
 from fasthtml.common import *
 from monsterui.all import *
-from base64 import b64encode
 
 from monsterui.franken import Uk_select
-from keybindings_fps.create_db_structure import init_db
+from keybindings_fps.create_db_structure import ConnectionFactory
+from keybindings_fps.async_db import AsyncDB
 from keybindings_fps.manipulate_db_contents import *
 from keybindings_fps.helpers import *
 from keybindings_fps.gui_binding_tables import *
+from keybindings_fps.metrics import RouteMetrics
+from keybindings_fps.sql_profiler import SQLProfiler
 
-app, rt = fast_app(hdrs=(Theme.slate.headers(), SortableJS('.sortable')), default_hdrs=True, live=True)
-db = init_db()
+# Every request checks out its own connection, so concurrent requests don't wait on one handle
+connections = ConnectionFactory(mode='pool')
+# All writes of this process go through one writer thread, which commits the writes that wait together
+writes = WriteQueue(connections)
+# The routes await the database through a bounded pool of threads, so the event loop stays free for other requests
+data = AsyncDB(connections, writes)
+metrics = RouteMetrics()
+profiler = SQLProfiler()
+app, rt = fast_app(hdrs=(Theme.slate.headers(), SortableJS('.sortable')), default_hdrs=True, live=True,
+                   on_shutdown=[close_image_client, data.close, writes.close, connections.close],
+                   middleware=connections.middleware() + metrics.middleware() + profiler.middleware())
+db = connections.db
+connections.on_connect(metrics.track_queries)
+connections.on_connect(profiler.install)
 
 print(db.conn.filename)
 
-def create_edit_screen(id: int):
+def create_edit_screen(db, id: int):
     print(f"Editing binding {id}")
     binding = next(db.t.bindings.rows_where("id = ?", [id]))
     
     # Get action with error handling
-    try:
-        action = next(db.t.actions.rows_where("id = ?", [binding['action_id']]))
+    action = catalog.row(db, 'actions', binding['action_id'])
+    if action:
         action_name = action['name']
-    except StopIteration:
+    else:
         action_name = f"Unknown Action (ID: {binding['action_id']})"
         print(f"Warning: Action ID {binding['action_id']} not found for binding {id}")
     
     # Get default binding with error handling
-    try:
-        default_binding = next(db.t.bindings.rows_where(
-            "game_id = ? AND action_id = ?", 
-            [1, binding['action_id']] # game_id is always 1 for default
-        ))
-    except StopIteration:
-        # Create a dummy default binding if none exists
-        default_binding = {'key_id': 0, 'modifier_id': 0}
+    default_bindings = get_default_bindings(db)
+    if binding['action_id'] not in default_bindings:
         print(f"Warning: No default binding found for action ID {binding['action_id']}")
+    # A dummy default binding if none exists
+    default_key_id, default_modifier_id = default_bindings.get(binding['action_id'], (0, 0))
 
-    keys = db.t.game_keys()
-    modifiers = db.t.modifiers()
-    
-    # If binding has a key_id that doesn't exist, mark it as invalid but still allow editing
-    has_invalid_key = True
-    has_invalid_modifier = True
-    
-    # Find key index with error handling
-    try:
-        key_idx = next(i for i, k in enumerate(keys) if k['id']==binding['key_id'])
-        has_invalid_key = False
-    except StopIteration:
-        # Key not found, set to first key as fallback
-        key_idx = 0
+    # If binding has a key_id that doesn't exist, mark it as invalid but still allow editing.
+    # The first option is selected as fallback.
+    has_invalid_key = catalog.row(db, 'game_keys', binding['key_id']) is None
+    if has_invalid_key:
         print(f"Warning: Key ID {binding['key_id']} not found for binding {id}")
         
-    # Find modifier index with error handling
-    try:
-        mod_idx = next(i for i, k in enumerate(modifiers) if k['id']==binding['modifier_id'])
-        has_invalid_modifier = False
-    except StopIteration:
-        # Modifier not found, set to first modifier as fallback
-        mod_idx = 0
+    has_invalid_modifier = catalog.row(db, 'modifiers', binding['modifier_id']) is None
+    if has_invalid_modifier:
         print(f"Warning: Modifier ID {binding['modifier_id']} not found for binding {id}")
 
     # Get default key and modifier with error handling
-    try:
-        default_key = next(db.t.game_keys.rows_where("id = ?", [default_binding['key_id']]))
-    except StopIteration:
+    default_key = catalog.row(db, 'game_keys', default_key_id)
+    if default_key is None:
         # Default key not found
         default_key = {"name": "Unknown"}
-        print(f"Warning: Default key ID {default_binding['key_id']} not found")
+        print(f"Warning: Default key ID {default_key_id} not found")
         
-    try:
-        default_mod = next(db.t.modifiers.rows_where("id = ?", [default_binding['modifier_id']]))
-    except StopIteration:
+    default_mod = catalog.row(db, 'modifiers', default_modifier_id)
+    if default_mod is None:
         # Default modifier not found
         default_mod = {"name": "Unknown"}
-        print(f"Warning: Default modifier ID {default_binding['modifier_id']} not found")
+        print(f"Warning: Default modifier ID {default_modifier_id} not found")
         
     # Get current description or set default
     description = binding.get('description', '')
@@ -102,12 +95,12 @@ def create_edit_screen(id: int):
         Form(Grid(
                 Div(  # Left column - edit controls
                     LabelSelect(
-                        *[Option(k['name'], value=k['id'], selected=(i==key_idx)) for i, k in enumerate(keys)],
+                        select_options(db, 'game_keys', None if has_invalid_key else binding['key_id']),
                         name="key_id",
                         label="Key"
                     ),
                     LabelSelect(
-                        *[Option(m['name'], value=m['id'], selected=(i==mod_idx)) for i, m in enumerate(modifiers)],
+                        select_options(db, 'modifiers', None if has_invalid_modifier else binding['modifier_id']),
                         name="modifier_id",
                         label="Modifier"
                     ),
@@ -125,38 +118,42 @@ def create_edit_screen(id: int):
                 type="submit",
                 cls=ButtonT.primary,
                 hx_post=f"/binding/{id}/update",
-                hx_target="#bindings-table",
-                uk_toggle="target: #edit-modal")  # Close modal after save
+                hx_target=f"#binding-{id}",
+                hx_swap="outerHTML"),
+            Button("Cancel",
+                type="button",
+                cls=ButtonT.secondary,
+                hx_get=f"/binding/{id}/cancel",
+                hx_target=f"#binding-{id}",
+                hx_swap="outerHTML"),
             ),
         )
 
 @rt('/')
-def get():
-    def image_or_placeholder(image_data):
-        if image_data:
-            b64_image = b64encode(image_data).decode('utf-8')
-            return Img(src=f"data:image/jpeg;base64,{b64_image}",
-                       cls=(TextT.muted, TextT.italic, BackgroundT.muted))
-        return Div("No image", cls=(TextT.muted, TextT.italic, BackgroundT.muted))
-    
-    # Game grid
-    games = db.t.games.rows_where("name != ? ORDER BY name", ["default"])  # Exclude default template
-    game_grid = Grid(
-        *[A(Card(
-            CardHeader(H3(game['name']), cls="text-primary"),
-            CardBody(
-                image_or_placeholder(game['image']),
-                P(f"Type: {game['game_type']}", cls=(TextT.muted))
-            ),
-            cls=CardT.hover  # Makes whole card clickable
-        ), href=f"/game/{game['id']}") for game in games],
-        id="games-grid"
-    )
+async def get():
+    # Game grid, further pages are loaded from /games when the "Load more games" button scrolls into view
+    game_grid = Grid(*await data.read(games_grid_page), id="games-grid")
 
     return base_layout(game_grid)
 
+@rt('/games')
+async def get(after: str = None):
+    """Next page of the games grid"""
+    return await data.read(games_grid_page, after)
+
+@rt('/metrics')
+async def get():
+    """Per-route metrics in the Prometheus text format, when enabled with KBFPS_METRICS=1"""
+    return metrics.response()
+
+@rt('/debug/sql')
+async def get(route: str = None, format: str = 'html'):
+    """SQL statement timings and query plans per route, when enabled with KBFPS_SQL_PROFILE=1"""
+    # Explaining the query plans runs queries on the connection of this read
+    return await data.read(lambda db: profiler.response(db, route, format))
+
 @rt('/add_game')
-def get():
+async def get():
     game_type_options = ['tactical', 'dumb']
 
     form = Form(
@@ -184,25 +181,27 @@ def get():
     return base_layout(form)
 
 @rt('/add_game')
-def post(name: str, game_type: str, image_url: str = ""):
+async def post(name: str, game_type: str, image_url: str = ""):
     try:
-        upsert_game(db, name, game_type, image_url)
-        copy_default_bindings(db, name)
-        return "Game added successfully with default bindings!"
+        # The image is downloaded in the background after the response is sent
+        game = await data.add_game(name, game_type)
+        message = "Game added successfully with default bindings!"
+        if image_url:
+            return message, BackgroundTask(data.update_game_image, game['id'], image_url)
+        return message
     except Exception as e:
         return Div(f"Error: {str(e)}", cls=AlertT.error)
 
 @rt('/edit_actions')
-def get():
+async def get():
     """Show page for editing an action"""
-    return base_layout(create_actions_table(db))
+    return base_layout(await data.read(create_actions_table))
 
 @rt('/add_action')
-def get():
+async def get():
     """Show page for adding a new action"""
-    # Get existing categories for the dropdown
-    categories = [c['name'] for c in db.t.categories()]
-    
+    categories, keys, modifiers = await data.read(
+        lambda db: [select_options(db, table, value='name') for table in ('categories', 'game_keys', 'modifiers')])
     form = Form(
         H2("Add New Action", cls=("bg-primary text-primary-content", TextT.center)),
         LabelInput("Action Name", 
@@ -211,18 +210,18 @@ def get():
                   cls="text-primary"
                   ),
         LabelSelect(
-            *[Option(c) for c in categories],
+            categories,
             name="category",
             label="Categories",
             cls="text-primary"
         ),
         LabelSelect(
-            *[Option(k['name'], value=k['name']) for k in db.t.game_keys()],
+            keys,
             label="Default Key",
             name="default_keybinding",
         ),
         LabelSelect(
-            *[Option(m['name'], value=m['name']) for m in db.t.modifiers()],
+            modifiers,
             label="Default Modifier",
             
             name="default_modifier",
@@ -235,7 +234,7 @@ def get():
     return base_layout(form)
 
 @rt('/add_action')
-def post(name: str, category: str = "", default_keybinding: str = "", default_modifier: str = ""):
+async def post(name: str, category: str = "", default_keybinding: str = "", default_modifier: str = ""):
     """Add a new action"""
     print("Adding action", name, category, default_keybinding, default_modifier)
     try:
@@ -245,7 +244,7 @@ def post(name: str, category: str = "", default_keybinding: str = "", default_mo
         if not name:
             raise ValueError("Please enter an action name")
             
-        add_new_action(db, name, category, default_keybinding, default_modifier)
+        await data.add_action(name, category, default_keybinding, default_modifier)
         return Div(
             Div("Action added successfully!"), 
             Button("Back to Home",
@@ -257,15 +256,35 @@ def post(name: str, category: str = "", default_keybinding: str = "", default_mo
     except Exception as e:
         return Div(f"Error: {str(e)}", cls=AlertT.error)
     
+@rt('/search')
+async def get(req, q: str = '', page: int = 1):
+    """Search the names of the games, actions and categories and the descriptions of the bindings"""
+    rows = await data.read(search_results, q, page)
+    # Typing in the search field and loading the next page only need the rows
+    if req.headers.get('hx-request'): return rows
+
+    return base_layout((
+        Input(type="search", name="q", value=q, placeholder="Search games, actions and descriptions",
+              autofocus=True,
+              hx_get="/search",
+              hx_trigger="input changed delay:300ms, search",
+              hx_target="#search-results",
+              hx_push_url="true"),
+        Table(Thead(Tr(Th("Game"), Th("Action"), Th("Category"), Th("Key (modifier)"), Th("Description"))),
+              Tbody(*rows, id="search-results"),
+              cls=(TableT.hover, TableT.sm, TableT.striped))
+    ))
+
 @rt('/settings')
-def get():
+async def get():
     return Container(nav(), ex_theme_switcher())
 
 @rt('/game/{game_id}')
-def get(game_id: int):
-
-    bindings = db.t.bindings.rows_where("game_id = ?", [game_id])
-    game = db.t.games[game_id]
+async def get(game_id: int, req):
+    headers, unchanged = await revalidate(data, game_id, req)
+    if unchanged: return unchanged
+    game = await data.game(game_id)
+    bindings_table = await data.read(create_bindings_table, game_id)
     
     return Div(nav(), Titled(
         f"Key Bindings - {game['name']}",
@@ -273,7 +292,7 @@ def get(game_id: int):
             DivRAligned(
                 Button("Copy Default Bindings", 
                     hx_post=f"/game/{game_id}/copy_defaults",
-                    hx_target="#bindings-table",
+                    hx_swap="none",
                     cls=(ButtonT.secondary)),
                 Button("Add Binding", 
                     hx_get=f"/game/{game_id}/add_binding",
@@ -283,6 +302,10 @@ def get(game_id: int):
                     hx_get=f"/game/{game_id}/print_layout",
                     hx_target="#game-page",
                     cls=(ButtonT.secondary)),
+                Button("Key conflicts",
+                    hx_get=f"/game/{game_id}/conflicts",
+                    hx_target="#game-page",
+                    cls=(ButtonT.secondary)),
                 Button("Delete game",
                     hx_delete=f"/game/{game_id}/delete",
                     hx_target="#game-page",
@@ -290,34 +313,34 @@ def get(game_id: int):
                 cls="space-x-4",
                 id="game-page-buttons"
             ),
-            Div(create_bindings_table(db, game_id), id="bindings-table"),
+            Div(id="binding-messages"),
+            Div(bindings_table, id="bindings-table"),
             )
         ),
         id="game-page"
-    )
+    ), *http_headers(headers)
 
 @rt('/game/{game_id}/add_binding')
-def get(game_id: int):
+async def get(game_id: int):
     """Show page for adding a new binding"""
-    game = db.t.games[game_id]
-    actions = db.t.actions.rows
-    keys = db.t.game_keys()
-    modifiers = db.t.modifiers()
+    game = await data.game(game_id)
+    actions, keys, modifiers = await data.read(
+        lambda db: [select_options(db, table) for table in ('actions', 'game_keys', 'modifiers')])
     
     form = Form(
         H2(f"Add New Binding for {game['name']}"),
         LabelSelect(
-            *[Option(a['name'], value=a['id']) for a in actions],
+            actions,
             name="action_id",
             label="Action"
         ),
         LabelSelect(
-            *[Option(k['name'], value=k['id']) for k in keys],
+            keys,
             name="key_id",
             label="Key"
         ),
         LabelSelect(
-            *[Option(m['name'], value=m['id']) for m in modifiers],
+            modifiers,
             name="modifier_id",
             label="Modifier"
         ),
@@ -337,7 +360,7 @@ def get(game_id: int):
     )
 
 @rt('/game/{game_id}/add_binding')
-def post(game_id: int, action_id: int, key_id: int, modifier_id: int):
+async def post(game_id: int, action_id: int, key_id: int, modifier_id: int):
     """Add a new binding"""
     try:
         # Validate that a key has been selected
@@ -345,15 +368,10 @@ def post(game_id: int, action_id: int, key_id: int, modifier_id: int):
             return Div("Please choose a key to bind to this action", cls=AlertT.warning)
             
         # Add the binding
-        db.t.bindings.insert(dict(
-            game_id=game_id,
-            action_id=action_id,
-            key_id=key_id,
-            modifier_id=modifier_id
-        ))
+        binding, clashes = await data.add_binding(game_id, action_id, key_id, modifier_id)
         print("Binding added successfully!")
         
-        return Div(P("Binding added successfully!"), 
+        return Div(P("Binding added successfully!"), conflict_warning(game_id, clashes),
                    A("Back to Game",
                      href=f"/game/{game_id}",
                      cls=(ButtonT.primary, 'pl-3'))) 
@@ -361,15 +379,15 @@ def post(game_id: int, action_id: int, key_id: int, modifier_id: int):
         return Div(f"Error: {str(e)}", cls=AlertT.error)
 
 @rt('/game/{game_id}/copy_defaults')
-def post(game_id: int):
-    game = db.t.games[game_id]
-    copy_default_bindings(db,game['name'])
+async def post(game_id: int):
+    # Only the actions that differ from the default game are copied, and only their categories come back
+    categories = await data.reset_game_bindings(game_id)
     
-    return create_bindings_table(db, game_id=game_id)
+    return *await data.read(category_tables_oob, game_id, categories), binding_messages()
 
 @rt('/game/{game_id}/delete')
-def delete(game_id: int):
-    del_message = delete_game(db, game_id)
+async def delete(game_id: int):
+    del_message = await data.delete_game(game_id)
     
     return Container(
         P(del_message),
@@ -380,10 +398,29 @@ def delete(game_id: int):
         )
     )
 
+@rt('/game/{game_id}/image')
+async def get(game_id: int, req):
+    """Serve the image of a game, cached by the browser and revalidated with its content hash"""
+    # The stored digest answers a revalidation without reading the image
+    digest = await data.read(game_image_digest, game_id)
+    if digest is None:
+        return Response(status_code=404)
+
+    # The url does not change when the image is replaced, so browsers revalidate after a week
+    headers = {'ETag': f'"{digest}"', 'Cache-Control': 'public, max-age=604800'}
+    if not_modified(req, headers):
+        return Response(status_code=304, headers=headers)
+    row = await data.read(lambda db: db.execute("SELECT image FROM games WHERE id = ?", [game_id]).fetchone())
+    # The game may have been deleted in the meantime
+    if not row or not row[0]:
+        return Response(status_code=404)
+    return Response(row[0], media_type=image_mime_type(row[0]), headers=headers)
+
 @rt('/game/{game_id}/print_layout')
-def get(game_id: int):
-    game = db.t.games[game_id]
-    bindings = db.t.bindings.rows_where("game_id = ?", [game_id])
+async def get(game_id: int, req):
+    headers, unchanged = await revalidate(data, game_id, req)
+    if unchanged: return unchanged
+    game = await data.game(game_id)
 
     nav = NavBar(
         brand=A(H4(game['name']), href=f"/game/{game_id}")
@@ -391,66 +428,63 @@ def get(game_id: int):
 
     return Container(
         nav,
-        create_bindings_table_print(db, game_id)
-    )
+        await data.read(create_bindings_table_print, game_id)
+    ), *http_headers(headers)
+
+@rt('/game/{game_id}/conflicts')
+async def get(game_id: int, req):
+    """Keys and modifiers that are bound to more than one action of the game"""
+    headers, unchanged = await revalidate(data, game_id, req)
+    if unchanged: return unchanged
+    game = await data.game(game_id)
+
+    nav = NavBar(
+        brand=A(H4(game['name']), href=f"/game/{game_id}")
+        )
+
+    return Container(
+        nav,
+        H3("Key conflicts"),
+        await data.read(create_conflicts_table, game_id)
+    ), *http_headers(headers)
     
 @rt("/game/{game_id}/reorder_bindings/{action_category_id}")
-def post(binding_id: list[int], action_category_id: int, game_id: int):
-    for i, binding_id_ in enumerate(binding_id):
-        db.t.bindings.update(
-            {'sort_order': i * 100},
-            binding_id_)
+async def post(binding_id: list[int], action_category_id: int, game_id: int):
+    await data.reorder_bindings(game_id, binding_id)
     
-    return create_binding_table_category(db, game_id, action_category_id)
+    return await data.read(category_tables_oob, game_id, [action_category_id])
 
 @rt('/binding/{id}/edit')
-def get(id: int):
-    return Div(
-        create_edit_screen(id),
-    )
+async def get(id: int):
+    return binding_editor_row(id, await data.read(create_edit_screen, id))
 
 @rt('/binding/{id}/update')
-def post(id: int, key_id: int, modifier_id: int, description: str):
-    # First get the current binding to get the game_id
-    current_binding = next(db.t.bindings.rows_where("id = ?", [id]))
-    game_id = current_binding['game_id']
-    
+async def post(id: int, key_id: int, modifier_id: int, description: str):
     # Validate that a key has been selected
     if not key_id:
-        return Div("Please choose a key to bind to this action", cls=AlertT.warning)
+        # Keep the edit screen open and show the warning above the tables
+        return binding_messages(Div("Please choose a key to bind to this action", cls=AlertT.warning)), HtmxResponseHeaders(reswap="none")
     
     # Update the binding with both key and modifier
-    binding = db.t.bindings.update(dict(
-        id=id,
-        key_id=key_id,
-        modifier_id=modifier_id,
-        description=description
-    ))
+    binding, clashes = await data.update_binding(id, key_id, modifier_id, description)
+    game_id = binding['game_id']
     
-    # Get all bindings for the game and return updated table
-    bindings = db.t.bindings.rows_where("game_id = ?", [game_id])
-    return create_bindings_table(db, game_id)
+    # Only the edited row changes, a warning goes to the message area above the tables
+    return await data.read(create_binding_row, id), binding_messages(conflict_warning(game_id, clashes))
 
 @rt('/binding/{id}/delete')
-def delete(id: int):
-    # First get the current binding to get the game_id
-    current_binding = next(db.t.bindings.rows_where("id = ?", [id]))
-    game_id = current_binding['game_id']
-    action_id = current_binding['action_id']
-    action_category_id = next(db.t.actions.rows_where("id = ?", [action_id]))['category_id']
-    
-    # Delete the binding
-    db.t.bindings.delete_where("id = ?", [id])
-    
-    return create_binding_table_category(db, game_id, action_category_id)
+async def delete(id: int):
+    # The delete button removes the row from the page
+    await data.delete_binding(id)
+    return binding_messages()
 
 @rt('/binding/{id}/cancel')
-def get(id: int):
-    # Just return the table without changes
-    binding = next(db.t.bindings.rows_where("id = ?", [id]))
-    game_id = binding['game_id']
-    bindings = db.t.bindings.rows_where("game_id = ?", [game_id])
-    return create_bindings_table(db, game_id)
+async def get(id: int, req):
+    # Just put the row back without changes
+    binding = await data.binding(id)
+    headers, unchanged = await revalidate(data, binding['game_id'], req)
+    if unchanged: return unchanged
+    return await data.read(create_binding_row, id), *http_headers(headers)
 
 # setup_hf_backup(ap)
 